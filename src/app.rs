@@ -5,6 +5,7 @@ use std::process::Command;
 use anyhow::bail;
 
 use crate::cli::{Cli, CommandKind};
+use crate::commands::cache::cmd_cache;
 use crate::commands::context::{AppContext, GlobalFlags};
 use crate::commands::install::cmd_install;
 use crate::commands::query::{cmd_info, cmd_installed, cmd_list, cmd_status, cmd_where};
@@ -12,7 +13,6 @@ use crate::commands::remove::cmd_remove;
 use crate::commands::search::cmd_search;
 use crate::commands::secret::cmd_secret;
 use crate::commands::system::{cmd_rebuild, cmd_test, cmd_undo, cmd_update, cmd_upgrade};
-use crate::domain::config::ConfigFiles;
 use crate::infra::self_refresh::maybe_refresh_before_system_command;
 use crate::output::printer::Printer;
 use crate::output::style::OutputStyle;
@@ -39,8 +39,7 @@ pub fn execute(cli: Cli) -> i32 {
         }
     };
 
-    let config_files = ConfigFiles::discover(&repo_root);
-    let ctx = AppContext::new(repo_root, printer, config_files, global_flags);
+    let ctx = AppContext::new(repo_root, printer, global_flags);
 
     match cli.command {
         CommandKind::Install(args) => cmd_install(&args, &ctx),
@@ -57,6 +56,7 @@ pub fn execute(cli: Cli) -> i32 {
         CommandKind::Test => cmd_test(&ctx),
         CommandKind::Rebuild(args) => cmd_rebuild(&args, &ctx),
         CommandKind::Upgrade(args) => cmd_upgrade(&args, &ctx),
+        CommandKind::Cache(args) => cmd_cache(&args, &ctx),
     }
 }
 
@@ -74,6 +74,29 @@ fn find_repo_root() -> anyhow::Result<PathBuf> {
 }
 
 fn git_repo_root() -> Option<PathBuf> {
+    let candidate = if relocated_git_env() {
+        git_toplevel()?
+    } else {
+        // The work tree is the nearest ancestor holding `.git` (a directory,
+        // or a file for worktrees and submodules). Finding it directly keeps a
+        // git process spawn off the startup path of every command.
+        let cwd = env::current_dir().ok()?;
+        cwd.ancestors()
+            .find(|dir| dir.join(".git").exists())?
+            .to_path_buf()
+    };
+    candidate.join("flake.nix").exists().then_some(candidate)
+}
+
+/// Whether the environment points git somewhere other than the cwd's
+/// ancestors, in which case only git itself can resolve the work tree.
+fn relocated_git_env() -> bool {
+    ["GIT_DIR", "GIT_WORK_TREE", "GIT_CEILING_DIRECTORIES"]
+        .iter()
+        .any(|var| env::var_os(var).is_some())
+}
+
+fn git_toplevel() -> Option<PathBuf> {
     let output = Command::new("git")
         .args(["rev-parse", "--show-toplevel"])
         .output()
@@ -84,8 +107,7 @@ fn git_repo_root() -> Option<PathBuf> {
     }
 
     let root = String::from_utf8_lossy(&output.stdout).trim().to_string();
-    let candidate = PathBuf::from(&root);
-    candidate.join("flake.nix").exists().then_some(candidate)
+    Some(PathBuf::from(root))
 }
 
 fn resolve_repo_root(
@@ -20,6 +20,7 @@ const KNOWN_COMMANDS: &[&str] = &[
     "test",
     "rebuild",
     "upgrade",
+    "cache",
 ];
 
 const ROOT_HELP: &str = "Run `nx <command> --help` for command-specific usage and examples.";
@@ -127,6 +128,8 @@ pub enum CommandKind {
     Rebuild(PassthroughArgs),
     #[command(about = "Run full upgrade flow (flake, brew, rebuild, commit)")]
     Upgrade(UpgradeArgs),
+    #[command(about = "Manage cached package lookups")]
+    Cache(CacheArgs),
 }
 
 #[derive(Debug, Clone, Parser, Default)]
@@ -331,6 +334,19 @@ impl SecretAddArgs {
     }
 }
 
+#[derive(Debug, Clone, Parser)]
+#[command(about = "Manage cached package lookups")]
+pub struct CacheArgs {
+    #[command(subcommand)]
+    pub command: CacheCommand,
+}
+
+#[derive(Debug, Clone, Subcommand)]
+pub enum CacheCommand {
+    #[command(about = "Forget cached search and nix eval results")]
+    Clear,
+}
+
 #[derive(Debug, Clone, Parser)]
 pub struct WhereArgs {
     #[arg(value_name = "PACKAGE")]
@@ -531,9 +547,10 @@ mod tests {
         assert!(spec_commands.is_subset(&known_commands));
 
         let extensions: BTreeSet<_> = known_commands.difference(&spec_commands).copied().collect();
-        let expected_extensions: BTreeSet<_> = ["search", "secret", "secrets", "uninstall"]
-            .into_iter()
-            .collect();
+        let expected_extensions: BTreeSet<_> =
+            ["cache", "search", "secret", "secrets", "uninstall"]
+                .into_iter()
+                .collect();
         assert_eq!(extensions, expected_extensions);
     }
 
@@ -682,6 +699,17 @@ mod tests {
         assert_eq!(root_short_flags(), expected_shorts);
     }
 
+    #[test]
+    fn cache_clear_parses() {
+        let cli = Cli::try_parse_from(["nx", "cache", "clear"]).expect("cache clear should parse");
+        assert!(matches!(
+            cli.command,
+            CommandKind::Cache(CacheArgs {
+                command: CacheCommand::Clear
+            })
+        ));
+    }
+
     #[test]
     fn secret_add_parses_positional_key() {
         let cli = Cli::try_parse_from(["nx", "secret", "add", "redacted_api_key", "--value", "v"])
@@ -0,0 +1,18 @@
+use crate::cli::{CacheArgs, CacheCommand};
+use crate::commands::context::AppContext;
+use crate::infra::cache::clear_lookup_caches;
+
+pub fn cmd_cache(args: &CacheArgs, ctx: &AppContext) -> i32 {
+    match args.command {
+        CacheCommand::Clear => match clear_lookup_caches() {
+            Ok(()) => {
+                ctx.printer.success("Cleared cached package lookups");
+                0
+            }
+            Err(err) => {
+                ctx.printer.error(&format!("cache clear failed: {err:#}"));
+                1
+            }
+        },
+    }
+}
@@ -1,4 +1,5 @@
 use std::path::PathBuf;
+use std::sync::OnceLock;
 
 use crate::domain::config::ConfigFiles;
 use crate::output::printer::Printer;
@@ -11,25 +12,29 @@ pub struct GlobalFlags {
 pub struct AppContext {
     pub repo_root: PathBuf,
     pub printer: Printer,
-    pub config_files: ConfigFiles,
     pub flags: GlobalFlags,
+    config_files: OnceLock<ConfigFiles>,
 }
 
 impl AppContext {
-    pub const fn new(
-        repo_root: PathBuf,
-        printer: Printer,
-        config_files: ConfigFiles,
-        flags: GlobalFlags,
-    ) -> Self {
+    pub const fn new(repo_root: PathBuf, printer: Printer, flags: GlobalFlags) -> Self {
         Self {
             repo_root,
             printer,
-            config_files,
             flags,
+            config_files: OnceLock::new(),
         }
     }
 
+    /// Config files under the repo, discovered on first use.
+    ///
+    /// Discovery walks the tree and reads each file's header, which only the
+    /// install flow needs, so query commands never pay for it.
+    pub fn config_files(&self) -> &ConfigFiles {
+        self.config_files
+            .get_or_init(|| ConfigFiles::discover(&self.repo_root))
+    }
+
     pub const fn wants_json(&self, local_json_flag: bool) -> bool {
         local_json_flag || self.flags.json
     }
@@ -1,7 +1,11 @@
-use std::collections::HashSet;
+use std::borrow::Cow;
+use std::cell::OnceCell;
+use std::collections::{HashMap, HashSet};
 use std::fs;
 use std::io::{self, BufRead, Write};
-use std::path::Path;
+use std::path::{Path, PathBuf};
+use std::thread;
+use std::time::SystemTime;
 
 use crate::cli::{InstallArgs, PassthroughArgs};
 use crate::commands::context::AppContext;
@@ -22,9 +26,9 @@ use crate::infra::ai_engine::{
 };
 use crate::infra::cache::MultiSourceCache;
 use crate::infra::file_edit::{EditOutcome, apply_edit};
-use crate::infra::finder::find_package;
+use crate::infra::finder::{find_first_package, find_package};
 use crate::infra::flake_input::{FlakeInputEdit, add_flake_input};
-use crate::infra::shell::git_diff;
+use crate::infra::shell::git_diff_path;
 use crate::infra::sources::{check_nix_available, search_all_sources};
 use crate::output::printer::Printer;
 
@@ -49,8 +53,10 @@ pub fn cmd_install(args: &InstallArgs, ctx: &AppContext) -> i32 {
     ctx.printer.action(&format!("Installing {pkg_list}"));
 
     let engine = select_engine(args.engine(), args.model());
-    let routing_context = build_routing_context(&ctx.config_files);
+    let routing = OnceCell::new();
     let mut cache = load_cache(ctx);
+    let mut search = SearchInputs::new(args, ctx);
+    prefetch_searches(args, ctx, cache.as_ref(), &mut search);
 
     let mut success_count = 0;
 
@@ -60,13 +66,21 @@ pub fn cmd_install(args: &InstallArgs, ctx: &AppContext) -> i32 {
             args,
             ctx,
             &mut cache,
+            &mut search,
             engine.as_ref(),
-            &routing_context,
+            &routing,
         ) {
             success_count += 1;
         }
     }
 
+    if let Some(cache) = cache.as_mut()
+        && let Err(err) = cache.flush()
+    {
+        ctx.printer
+            .warn(&format!("failed to update search cache: {err}"));
+    }
+
     run_post_install_actions(success_count, args, ctx, || {
         let passthrough = PassthroughArgs {
             passthrough: Vec::new(),
@@ -89,24 +103,108 @@ fn run_post_install_actions<F>(
         return;
     }
 
-    println!();
-    Printer::detail("Run: nx rebuild");
+    Printer::detail_spaced("Run: nx rebuild");
 
     if args.rebuild() {
         let _ = rebuild();
     }
 }
 
+/// Search inputs that stay fixed for a whole install run.
+///
+/// Source preferences and the flake.lock probe depend only on the flags and
+/// the repo, so they are derived once rather than for every package searched.
+struct SearchInputs {
+    prefs: SourcePreferences,
+    flake_lock: Option<PathBuf>,
+    /// Results fetched ahead of time by [`prefetch_searches`], taken on use.
+    prefetched: HashMap<String, Vec<SourceResult>>,
+}
+
+impl SearchInputs {
+    fn new(args: &InstallArgs, ctx: &AppContext) -> Self {
+        let flake_lock = ctx.repo_root.join("flake.lock");
+        Self {
+            prefs: source_prefs_from_args(args),
+            flake_lock: flake_lock.exists().then_some(flake_lock),
+            prefetched: HashMap::new(),
+        }
+    }
+
+    fn flake_lock(&self) -> Option<&Path> {
+        self.flake_lock.as_deref()
+    }
+}
+
+/// Upper bound on source searches run at once for a multi-package install.
+const MAX_PARALLEL_SEARCHES: usize = 16;
+
+/// Search sources for every requested package that will need a search,
+/// running the lookups concurrently.
+///
+/// Each search is dominated by subprocess and network waits, so a batch takes
+/// as long as its slowest lookup instead of the sum of all of them. Installed
+/// and cached packages are skipped, and everything after the search
+/// (selection prompts, edits, cache writes) still runs one package at a time.
+fn prefetch_searches(
+    args: &InstallArgs,
+    ctx: &AppContext,
+    cache: Option<&MultiSourceCache>,
+    search: &mut SearchInputs,
+) {
+    // A single package gains nothing, `--explain` keeps its sequential log,
+    // and explicit --cask / --mas lookups skip the search anyway.
+    if args.packages.len() < 2 || args.explain() || args.cask() || args.mas() {
+        return;
+    }
+
+    let mut seen = HashSet::new();
+    let pending: Vec<&str> = args
+        .packages
+        .iter()
+        .map(String::as_str)
+        .filter(|package| seen.insert(*package))
+        .filter(|package| matches!(find_package(package, &ctx.repo_root), Ok(None)))
+        .filter(|package| cache.is_none_or(|cache| cache.get_all(package).is_empty()))
+        .collect();
+    if pending.len() < 2 {
+        return;
+    }
+
+    let prefs = &search.prefs;
+    let flake_lock_path = search.flake_lock();
+    let mut prefetched = HashMap::new();
+    for batch in pending.chunks(MAX_PARALLEL_SEARCHES) {
+        thread::scope(|scope| {
+            let handles: Vec<_> = batch
+                .iter()
+                .map(|&package| {
+                    scope.spawn(move || search_all_sources(package, prefs, flake_lock_path))
+                })
+                .collect();
+            for (&package, handle) in batch.iter().zip(handles) {
+                // A panicked search is left out so the package is searched
+                // again on the sequential path.
+                if let Ok(results) = handle.join() {
+                    prefetched.insert(package.to_string(), results);
+                }
+            }
+        });
+    }
+    search.prefetched = prefetched;
+}
+
 /// Install a single package. Returns `true` on success.
 fn install_one(
     package: &str,
     args: &InstallArgs,
     ctx: &AppContext,
     cache: &mut Option<MultiSourceCache>,
+    search: &mut SearchInputs,
     engine: &dyn AiEngine,
-    routing_context: &str,
+    routing: &OnceCell<RoutingInputs>,
 ) -> bool {
-    let resolved = match start_install_resolution(package, args, ctx, cache) {
+    let resolved = match start_install_resolution(package, args, ctx, cache, search) {
         InstallStart::Proceed(resolved) => resolved,
         InstallStart::Completed => return true,
         InstallStart::Failed => return false,
@@ -114,14 +212,9 @@ fn install_one(
 
     announce_install_phase(args, ctx, resolved.platform_warning.as_deref());
 
-    let Some(prepared) = prepare_install_phase(
-        package,
-        resolved.source_result,
-        args,
-        ctx,
-        engine,
-        routing_context,
-    ) else {
+    let Some(prepared) =
+        prepare_install_phase(package, resolved.source_result, args, ctx, engine, routing)
+    else {
         return false;
     };
 
@@ -133,6 +226,7 @@ fn start_install_resolution(
     args: &InstallArgs,
     ctx: &AppContext,
     cache: &mut Option<MultiSourceCache>,
+    search: &mut SearchInputs,
 ) -> InstallStart {
     match find_package(package, &ctx.repo_root) {
         Ok(Some(location)) => {
@@ -146,7 +240,7 @@ fn start_install_resolution(
         }
     }
 
-    let Some(resolution) = search_for_package(package, args, ctx, cache) else {
+    let Some(resolution) = search_for_package(package, args, ctx, cache, search) else {
         return InstallStart::Failed;
     };
 
@@ -185,9 +279,9 @@ fn prepare_install_phase(
     args: &InstallArgs,
     ctx: &AppContext,
     engine: &dyn AiEngine,
-    routing_context: &str,
+    routing: &OnceCell<RoutingInputs>,
 ) -> Option<PreparedInstall> {
-    let mut plan = match build_install_plan(&source_result, &ctx.config_files) {
+    let mut plan = match build_install_plan(&source_result, &ctx.config_files()) {
         Ok(plan) => plan,
         Err(err) => {
             ctx.printer.error(&format!("{package}: {err}"));
@@ -195,7 +289,7 @@ fn prepare_install_phase(
         }
     };
 
-    refine_routing(&mut plan, engine, routing_context, ctx);
+    refine_routing(&mut plan, engine, routing, ctx);
 
     if !gate_flake_input(package, &plan, args, ctx, engine) {
         return None;
@@ -207,12 +301,7 @@ fn prepare_install_phase(
         ctx.printer.warn(warning);
     }
 
-    let rel_target = plan
-        .target_file
-        .strip_prefix(&ctx.repo_root)
-        .unwrap_or(&plan.target_file)
-        .display()
-        .to_string();
+    let rel_target = repo_relative(&plan.target_file, &ctx.repo_root).into_owned();
 
     Some(PreparedInstall {
         source_name: source_result.name,
@@ -271,38 +360,53 @@ fn render_dry_run_install(prepared: &PreparedInstall, ctx: &AppContext) {
     }
 }
 
+/// Routing prompt inputs shared by every package in an install batch.
+///
+/// Both depend only on the discovered config files, so they are derived once
+/// per run, on the first package that needs AI routing; batches that never
+/// route (installed packages, casks, language packages) skip them entirely.
+struct RoutingInputs {
+    context: String,
+    /// Repo-relative nix manifests the AI engine may route a package to.
+    candidates: Vec<String>,
+}
+
+impl RoutingInputs {
+    fn new(ctx: &AppContext) -> Self {
+        let candidates = nix_manifest_candidates(ctx.config_files())
+            .iter()
+            .filter_map(|p| {
+                p.strip_prefix(&ctx.repo_root)
+                    .ok()
+                    .and_then(|r| r.to_str())
+                    .map(String::from)
+            })
+            .collect();
+        Self {
+            context: build_routing_context(ctx.config_files()),
+            candidates,
+        }
+    }
+}
+
 /// Refine routing for general nix packages via AI engine.
 fn refine_routing(
     plan: &mut InstallPlan,
     engine: &dyn AiEngine,
-    routing_context: &str,
+    routing: &OnceCell<RoutingInputs>,
     ctx: &AppContext,
 ) {
     if plan.routing_warning.is_none() || plan.insertion_mode != InsertionMode::NixManifest {
         return;
     }
+    let routing = routing.get_or_init(|| RoutingInputs::new(ctx));
 
-    let candidates: Vec<String> = nix_manifest_candidates(&ctx.config_files)
-        .iter()
-        .filter_map(|p| {
-            p.strip_prefix(&ctx.repo_root)
-                .ok()
-                .and_then(|r| r.to_str())
-                .map(String::from)
-        })
-        .collect();
-
-    let fallback = plan
-        .target_file
-        .strip_prefix(&ctx.repo_root)
-        .unwrap_or(&plan.target_file)
-        .to_string_lossy()
-        .to_string();
+    let fallback = repo_relative(&plan.target_file, &ctx.repo_root);
 
     let decision = engine.route_package(
         &plan.package_token,
-        routing_context,
-        &candidates,
+        &routing.context,
+        &routing.candidates,
         &fallback,
         &ctx.repo_root,
     );
@@ -337,10 +441,12 @@ fn gate_flake_input(
         ));
         return false;
     };
-    Printer::detail(&format!("URL: {flake_url}"));
+    Printer::detail(&format_args!("URL: {flake_url}"));
 
     if args.dry_run() {
-        Printer::detail(&format!("[DRY RUN] Would add flake input for {package}"));
+        Printer::detail(&format_args!(
+            "[DRY RUN] Would add flake input for {package}"
+        ));
         return true; // counted as success in dry-run
     }
     if !args.yes() && !Printer::confirm("Add flake input?", true) {
@@ -351,11 +457,11 @@ fn gate_flake_input(
     let flake_path = ctx.repo_root.join("flake.nix");
     match add_flake_input(&flake_path, flake_url, None) {
         Ok(FlakeInputEdit::Added { input_name }) => {
-            Printer::detail(&format!("added input '{input_name}'"));
+            Printer::detail(&format_args!("added input '{input_name}'"));
             true
         }
         Ok(FlakeInputEdit::AlreadyExists { input_name }) => {
-            Printer::detail(&format!("input '{input_name}' already exists"));
+            Printer::detail(&format_args!("input '{input_name}' already exists"));
             true
         }
         Err(err) => {
@@ -374,7 +480,7 @@ fn execute_edit(
     engine: &dyn AiEngine,
 ) -> bool {
     let prompt = build_edit_prompt(plan);
-    let before_diff = git_diff(&ctx.repo_root);
+    let mut before: Option<TargetSnapshot> = None;
     let mut deterministic: Option<anyhow::Result<EditOutcome>> = None;
 
     let execution =
@@ -386,7 +492,10 @@ fn execute_edit(
                     output: "deterministic edit applied".to_string(),
                 })
             }
-            Err(err) if should_fallback_to_ai(engine, &err) => None,
+            Err(err) if should_fallback_to_ai(engine, &err) => {
+                before = Some(TargetSnapshot::capture(&plan.target_file, &ctx.repo_root));
+                None
+            }
             Err(err) => {
                 let message = err.to_string();
                 deterministic = Some(Err(err));
@@ -409,8 +518,7 @@ fn execute_edit(
         return false;
     }
 
-    let after_diff = git_diff(&ctx.repo_root);
-    if after_diff == before_diff {
+    if before.is_some_and(|before| before.unchanged_now(&plan.target_file, &ctx.repo_root)) {
         println!();
         ctx.printer.success(&format!(
             "'{}' already present in {rel_target}",
@@ -430,6 +538,34 @@ fn execute_edit(
     true
 }
 
+/// Target file state taken before an AI edit, to tell afterwards whether the
+/// edit changed anything.
+///
+/// Only the target file is diffed, and when its size and modification time
+/// are untouched the second `git diff` is skipped altogether.
+struct TargetSnapshot {
+    stamp: Option<(SystemTime, u64)>,
+    diff: String,
+}
+
+impl TargetSnapshot {
+    fn capture(target: &Path, repo_root: &Path) -> Self {
+        Self {
+            stamp: file_stamp(target),
+            diff: git_diff_path(repo_root, target),
+        }
+    }
+
+    fn unchanged_now(&self, target: &Path, repo_root: &Path) -> bool {
+        file_stamp(target) == self.stamp || git_diff_path(repo_root, target) == self.diff
+    }
+}
+
+fn file_stamp(path: &Path) -> Option<(SystemTime, u64)> {
+    let metadata = fs::metadata(path).ok()?;
+    Some((metadata.modified().ok()?, metadata.len()))
+}
+
 fn should_fallback_to_ai(engine: &dyn AiEngine, err: &anyhow::Error) -> bool {
     engine.name() == "claude" && is_unsupported_edit_shape(err)
 }
@@ -491,18 +627,14 @@ fn maybe_setup_service_with<F>(
     }
 
     if args.dry_run() {
-        Printer::detail(&format!(
+        Printer::detail(&format_args!(
             "[DRY RUN] Would add launchd.agents.{package_name}"
         ));
         return;
     }
 
-    let services_path = ctx.config_files.services();
-    let services_target = services_path
-        .strip_prefix(&ctx.repo_root)
-        .unwrap_or(services_path.as_path())
-        .display()
-        .to_string();
+    let services_path = ctx.config_files().services();
+    let services_target = repo_relative(&services_path, &ctx.repo_root);
     let prompt = build_service_prompt(package_name, &services_target);
     let outcome = run_service_edit(&prompt);
 
@@ -530,6 +662,14 @@ fn build_service_prompt(name: &str, services_file: &str) -> String {
     )
 }
 
+/// `path` relative to the repo root for messages and prompts, borrowed from
+/// `path` whenever it is valid UTF-8.
+fn repo_relative<'a>(path: &'a Path, repo_root: &Path) -> Cow<'a, str> {
+    path.strip_prefix(repo_root)
+        .unwrap_or(path)
+        .to_string_lossy()
+}
+
 /// Map CLI flags to source preferences for search.
 fn source_prefs_from_args(args: &InstallArgs) -> SourcePreferences {
     SourcePreferences {
@@ -603,16 +743,19 @@ enum CandidateSelection {
 }
 
 /// Search all sources for a package. Returns `None` with error printed if not found.
+///
+/// Results [`prefetch_searches`] already found for this package stand in for
+/// a fresh search.
 fn search_for_package(
     package: &str,
     args: &InstallArgs,
     ctx: &AppContext,
     cache: &mut Option<MultiSourceCache>,
+    search: &mut SearchInputs,
 ) -> Option<SearchResolution> {
     // Explicit --cask / --mas skip search (instant, no ambiguity)
     if args.cask() || args.mas() {
-        let prefs = source_prefs_from_args(args);
-        let results = search_all_sources(package, &prefs, None);
+        let results = search_all_sources(package, &search.prefs, None);
         return resolve_search_candidates(package, &results, args, &ctx.repo_root, ctx);
     }
 
@@ -620,7 +763,7 @@ fn search_for_package(
         let cached = cache.get_all(package);
         if !cached.is_empty() {
             if args.explain() {
-                Printer::detail(&format!(
+                Printer::detail(&format_args!(
                     "Cache hit for '{package}' ({} sources)",
                     cached.len()
                 ));
@@ -629,11 +772,10 @@ fn search_for_package(
         }
     }
 
-    let prefs = source_prefs_from_args(args);
-    let flake_lock = ctx.repo_root.join("flake.lock");
-    let flake_lock_path = flake_lock.exists().then_some(flake_lock.as_path());
-
-    let results = search_all_sources(package, &prefs, flake_lock_path);
+    let results = search
+        .prefetched
+        .remove(package)
+        .unwrap_or_else(|| search_all_sources(package, &search.prefs, search.flake_lock()));
 
     if results.is_empty() {
         show_unknown_group(package, ctx);
@@ -642,12 +784,9 @@ fn search_for_package(
         return None;
     }
 
-    if let Some(cache) = cache.as_mut()
-        && let Err(err) = cache.set_many(&results)
-    {
-        ctx.printer.warn(&format!(
-            "failed to update search cache for {package}: {err}"
-        ));
+    // Written to disk once for the whole batch, after the install loop.
+    if let Some(cache) = cache.as_mut() {
+        cache.stage_many(&results);
     }
 
     resolve_search_candidates(package, &results, args, &ctx.repo_root, ctx)
@@ -664,18 +803,13 @@ fn resolve_search_candidates(
         return None;
     }
 
-    let display_indices = unique_source_candidate_indices(candidates);
-    let display_candidates: Vec<&SourceResult> = display_indices
-        .iter()
-        .map(|&idx| &candidates[idx])
-        .collect();
-
     match find_existing_for_candidates(candidates, repo_root) {
         Ok(Some(location)) => {
             show_resolution_groups(package, &[], Some(&location), ctx);
             Some(SearchResolution::AlreadyInstalled(location))
         }
         Ok(None) => {
+            let display_candidates = unique_source_candidates(candidates);
             show_resolution_groups(package, &display_candidates, None, ctx);
             if !args.yes() && !args.dry_run() && !display_candidates.is_empty() {
                 println!();
@@ -683,8 +817,7 @@ fn resolve_search_candidates(
 
             match choose_candidate_selection(args, &display_candidates, ctx) {
                 CandidateSelection::Selected(choice) => {
-                    let selected_index = display_indices[choice];
-                    resolve_platform_candidate(&candidates[selected_index], candidates, ctx)
+                    resolve_platform_candidate(display_candidates[choice], candidates, ctx)
                 }
                 CandidateSelection::Skipped => {
                     Printer::detail("Cancelled.");
@@ -710,7 +843,10 @@ fn choose_candidate_selection(
         || {
             let candidate = &candidates[0];
             let attr = candidate.attr.as_deref().unwrap_or(&candidate.name);
-            Printer::confirm(&format!("Install {attr} ({})?", candidate.source), true)
+            Printer::confirm(
+                &format_args!("Install {attr} ({})?", candidate.source),
+                true,
+            )
         },
         prompt_source_choice,
     )
@@ -792,14 +928,20 @@ where
 
     let reason = reason.unwrap_or_else(|| "not available on current platform".to_string());
 
-    for candidate in candidates {
-        if candidate.source != selected.source || candidate.attr == selected.attr {
-            continue;
-        }
-
+    // Search results often repeat an attr under several names, so each
+    // distinct same-source attr is evaluated at most once.
+    let mut tried = vec![primary_attr];
+    for candidate in candidates
+        .iter()
+        .filter(|candidate| candidate.source == selected.source)
+    {
         let Some(attr) = candidate.attr.as_deref() else {
             continue;
         };
+        if tried.contains(&attr) {
+            continue;
+        }
+        tried.push(attr);
 
         if check_available(attr).0 {
             return Ok(PlatformResolution::Fallback {
@@ -812,21 +954,23 @@ where
     Err(reason)
 }
 
-fn unique_source_candidate_indices(candidates: &[SourceResult]) -> Vec<usize> {
-    let mut seen = HashSet::new();
-    let mut indices = Vec::new();
-    for (idx, candidate) in candidates.iter().enumerate() {
-        if seen.insert(candidate.source) {
-            indices.push(idx);
+/// The best-ranked candidate from each source, in ranking order.
+///
+/// There are only a handful of sources, so membership is a scan of the
+/// short output list rather than a hash set.
+fn unique_source_candidates(candidates: &[SourceResult]) -> Vec<&SourceResult> {
+    let mut unique: Vec<&SourceResult> = Vec::new();
+    for candidate in candidates {
+        if !unique.iter().any(|seen| seen.source == candidate.source) {
+            unique.push(candidate);
         }
     }
-    indices
+    unique
 }
 
 fn show_unknown_group(package: &str, _ctx: &AppContext) {
-    println!();
-    Printer::detail("unknown/not found:");
-    Printer::detail(&format!("  - {package}"));
+    Printer::detail_spaced("unknown/not found:");
+    Printer::detail(&format_args!("  - {package}"));
 }
 
 fn show_resolution_groups(
@@ -836,8 +980,7 @@ fn show_resolution_groups(
     ctx: &AppContext,
 ) {
     if !installable.is_empty() {
-        println!();
-        Printer::detail("Found (1)");
+        Printer::detail_spaced("Found (1)");
 
         if installable.len() == 1 {
             let candidate = installable[0];
@@ -847,17 +990,17 @@ fn show_resolution_groups(
             } else {
                 format!(" - {}", truncate_text(&candidate.description, 50))
             };
-            Printer::detail(&format!("{package} via {source}{detail}"));
+            Printer::detail(&format_args!("{package} via {source}{detail}"));
         } else {
             Printer::detail(package);
             for (idx, candidate) in installable.iter().enumerate() {
                 let source = format_source_display(candidate.source, candidate.attr.as_deref());
-                Printer::detail(&format!("  {}. {source}", idx + 1));
+                Printer::detail(&format_args!("  {}. {source}", idx + 1));
                 if let Some(version) = candidate.version.as_deref() {
-                    Printer::detail(&format!("         Version:     {version}"));
+                    Printer::detail(&format_args!("         Version:     {version}"));
                 }
                 if !candidate.description.is_empty() {
-                    Printer::detail(&format!(
+                    Printer::detail(&format_args!(
                         "         Description: {}",
                         truncate_text(&candidate.description, 60)
                     ));
@@ -868,32 +1011,41 @@ fn show_resolution_groups(
 
     if let Some(location) = installed {
         Printer::detail("already installed:");
-        Printer::detail(&format!(
+        Printer::detail(&format_args!(
             "  - {package} ({})",
             relative_location(location, &ctx.repo_root)
         ));
     }
 }
 
-fn format_source_display(source: PackageSource, attr: Option<&str>) -> String {
+/// Source label for candidate listings; only an nxs attr needs formatting.
+fn format_source_display(source: PackageSource, attr: Option<&str>) -> Cow<'static, str> {
     match source {
-        PackageSource::Nxs => {
-            attr.map_or_else(|| "nxs".to_string(), |value| format!("nxs (pkgs.{value})"))
-        }
-        PackageSource::Nur => "NUR".to_string(),
-        PackageSource::FlakeInput => "Flake overlay".to_string(),
-        PackageSource::Homebrew => "Homebrew formula".to_string(),
-        PackageSource::Cask => "Homebrew cask".to_string(),
-        PackageSource::Mas => "Mac App Store".to_string(),
+        PackageSource::Nxs => attr.map_or(Cow::Borrowed("nxs"), |value| {
+            Cow::Owned(format!("nxs (pkgs.{value})"))
+        }),
+        PackageSource::Nur => Cow::Borrowed("NUR"),
+        PackageSource::FlakeInput => Cow::Borrowed("Flake overlay"),
+        PackageSource::Homebrew => Cow::Borrowed("Homebrew formula"),
+        PackageSource::Cask => Cow::Borrowed("Homebrew cask"),
+        PackageSource::Mas => Cow::Borrowed("Mac App Store"),
     }
 }
 
-fn truncate_text(text: &str, max_chars: usize) -> String {
-    if text.chars().count() <= max_chars {
-        return text.to_string();
-    }
-    let take = max_chars.saturating_sub(3);
-    format!("{}...", text.chars().take(take).collect::<String>())
+/// `text` cut to `max_chars` characters, ending in `...` when shortened.
+///
+/// Most descriptions fit, so those are borrowed as-is; the byte length bounds
+/// the char count, which lets short text skip the char walk entirely.
+fn truncate_text(text: &str, max_chars: usize) -> Cow<'_, str> {
+    if text.len() <= max_chars || text.char_indices().nth(max_chars).is_none() {
+        return Cow::Borrowed(text);
+    }
+    let keep = max_chars.saturating_sub(3);
+    let end = text
+        .char_indices()
+        .nth(keep)
+        .map_or(text.len(), |(idx, _)| idx);
+    Cow::Owned(format!("{}...", &text[..end]))
 }
 
 fn build_simulated_preview_line(package_token: &str, description: &str) -> String {
@@ -904,15 +1056,17 @@ fn build_simulated_preview_line(package_token: &str, description: &str) -> Strin
     format!("{package_token}  # {truncated}...")
 }
 
+/// One-based line of the last manifest entry, after which a new package would go.
+///
+/// Entries cluster at the end of a manifest, so the scan runs backwards and
+/// stops at the first entry it meets.
 fn find_preview_insert_after_line(file_path: &Path) -> Option<usize> {
     let content = fs::read_to_string(file_path).ok()?;
-    let mut insert_after = None;
-    for (idx, line) in content.lines().enumerate() {
-        if is_preview_manifest_entry(line) {
-            insert_after = Some(idx + 1);
-        }
-    }
-    insert_after
+    let lines: Vec<&str> = content.lines().collect();
+    lines
+        .iter()
+        .rposition(|line| is_preview_manifest_entry(line))
+        .map(|idx| idx + 1)
 }
 
 fn is_preview_manifest_entry(line: &str) -> bool {
@@ -954,11 +1108,11 @@ fn prompt_source_choice(count: usize) -> Option<usize> {
 }
 
 fn parse_source_choice(response: &str, count: usize) -> Option<usize> {
-    let trimmed = response.trim().to_ascii_lowercase();
+    let trimmed = response.trim();
     if trimmed.is_empty() {
         return Some(0);
     }
-    if trimmed == "n" || trimmed == "no" {
+    if trimmed.eq_ignore_ascii_case("n") || trimmed.eq_ignore_ascii_case("no") {
         return None;
     }
 
@@ -971,49 +1125,32 @@ fn parse_source_choice(response: &str, count: usize) -> Option<usize> {
     })
 }
 
+/// First installed location among every candidate's lookup names, checked in
+/// candidate order with one finder lookup for the whole set.
+///
+/// Names repeat heavily across candidates (every nxs hit shares its search
+/// name), so duplicates are dropped through a set as the names stream in.
 fn find_existing_for_candidates(
     candidates: &[SourceResult],
     repo_root: &Path,
 ) -> anyhow::Result<Option<PackageLocation>> {
-    for candidate in candidates {
-        if let Some(existing) = find_existing_for_result(candidate, repo_root)? {
-            return Ok(Some(existing));
-        }
-    }
-    Ok(None)
-}
-
-fn find_existing_for_result(
-    candidate: &SourceResult,
-    repo_root: &Path,
-) -> anyhow::Result<Option<PackageLocation>> {
-    for name in lookup_names(candidate) {
-        if let Some(location) = find_package(&name, repo_root)? {
-            return Ok(Some(location));
-        }
-    }
-    Ok(None)
-}
-
-fn lookup_names(candidate: &SourceResult) -> Vec<String> {
-    let mut names = Vec::new();
-
-    push_unique(&mut names, candidate.name.clone());
-
-    if let Some(attr) = candidate.attr.as_deref() {
-        push_unique(&mut names, attr.to_string());
-        if let Some((bare, _runtime, _method)) = detect_language_package(attr) {
-            push_unique(&mut names, bare.to_string());
-        }
-    }
-
-    names
+    let mut seen = HashSet::new();
+    let names = candidates
+        .iter()
+        .flat_map(lookup_names)
+        .filter(|name| !name.is_empty() && seen.insert(*name));
+    find_first_package(names, repo_root)
 }
 
-fn push_unique(items: &mut Vec<String>, value: String) {
-    if !value.is_empty() && !items.contains(&value) {
-        items.push(value);
-    }
+/// Names an installed copy of `candidate` may be listed under, borrowed from it.
+fn lookup_names(candidate: &SourceResult) -> impl Iterator<Item = &str> {
+    let attr = candidate.attr.as_deref();
+    let bare = attr
+        .and_then(detect_language_package)
+        .map(|(bare, _runtime, _method)| bare);
+    std::iter::once(candidate.name.as_str())
+        .chain(attr)
+        .chain(bare)
 }
 
 #[cfg(test)]
@@ -1026,11 +1163,9 @@ mod tests {
     use std::sync::atomic::{AtomicUsize, Ordering};
 
     use crate::commands::context::GlobalFlags;
-    use crate::domain::config::ConfigFiles;
     use crate::domain::source::PackageSource;
     use crate::infra::ai_engine::RouteDecision;
     use crate::output::printer::Printer;
-    use crate::output::style::OutputStyle;
     use tempfile::TempDir;
 
     fn source_result(name: &str, source: PackageSource, attr: Option<&str>) -> SourceResult {
@@ -1054,12 +1189,7 @@ mod tests {
     }
 
     fn test_context(root: &Path) -> AppContext {
-        AppContext::new(
-            root.to_path_buf(),
-            Printer::new(OutputStyle::from_flags(true, false, false)),
-            ConfigFiles::discover(root),
-            GlobalFlags::default(),
-        )
+        AppContext::new(root.to_path_buf(), Printer::plain(), GlobalFlags::default())
     }
 
     fn test_plan(root: &Path, token: &str) -> InstallPlan {
@@ -1156,15 +1286,44 @@ mod tests {
             Some("python3Packages.pyyaml"),
         );
 
-        let names = lookup_names(&result);
-        assert_eq!(
-            names,
-            vec![
-                "py-yaml".to_string(),
-                "python3Packages.pyyaml".to_string(),
-                "pyyaml".to_string()
-            ]
+        let names: Vec<&str> = lookup_names(&result).collect();
+        assert_eq!(names, vec!["py-yaml", "python3Packages.pyyaml", "pyyaml"]);
+    }
+
+    #[test]
+    fn truncate_text_borrows_fitting_text_and_cuts_on_char_boundaries() {
+        assert!(matches!(truncate_text("fast grep", 50), Cow::Borrowed(_)));
+        assert!(matches!(truncate_text("ééééé", 5), Cow::Borrowed(_)));
+        assert_eq!(truncate_text("ééééééé", 6), "ééé...");
+        assert_eq!(truncate_text("abcdefgh", 7), "abcd...");
+    }
+
+    #[test]
+    fn preview_insert_line_is_last_manifest_entry() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let root = tmp.path();
+        write_nix(
+            root,
+            "packages/nix/cli.nix",
+            "{ pkgs, ... }:\n{\n  home.packages = with pkgs; [\n    bat\n    ripgrep  # search\n    # fd\n  ];\n}\n",
         );
+
+        let line = find_preview_insert_after_line(&root.join("packages/nix/cli.nix"));
+        assert_eq!(line, Some(5));
+    }
+
+    #[test]
+    fn unique_source_candidates_keeps_best_ranked_per_source() {
+        let candidates = vec![
+            source_result("rg", PackageSource::Nxs, Some("ripgrep")),
+            source_result("rg", PackageSource::Homebrew, None),
+            source_result("rg", PackageSource::Nxs, Some("ripgrep-all")),
+        ];
+
+        let unique = unique_source_candidates(&candidates);
+        assert_eq!(unique.len(), 2);
+        assert_eq!(unique[0].attr.as_deref(), Some("ripgrep"));
+        assert_eq!(unique[1].source, PackageSource::Homebrew);
     }
 
     #[test]
@@ -1338,6 +1497,17 @@ mod tests {
         }
     }
 
+    #[test]
+    fn target_snapshot_reports_untouched_file_as_unchanged() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let root = tmp.path();
+        write_nix(root, "packages/nix/cli.nix", "[\n  ripgrep\n]\n");
+        let target = root.join("packages/nix/cli.nix");
+
+        let before = TargetSnapshot::capture(&target, root);
+        assert!(before.unchanged_now(&target, root));
+    }
+
     #[test]
     fn start_install_resolution_completes_when_package_already_installed() {
         let tmp = TempDir::new().expect("temp dir should be created");
@@ -1350,8 +1520,9 @@ mod tests {
         let ctx = test_context(root);
         let args = install_args_template();
         let mut cache = None;
+        let mut search = SearchInputs::new(&args, &ctx);
 
-        let state = start_install_resolution("ripgrep", &args, &ctx, &mut cache);
+        let state = start_install_resolution("ripgrep", &args, &ctx, &mut cache, &mut search);
         assert!(matches!(state, InstallStart::Completed));
     }
 
@@ -1380,7 +1551,12 @@ mod tests {
             },
         };
 
-        let prepared = prepare_install_phase("ripgrep", result, &args, &ctx, &engine, "routing");
+        let routing = OnceCell::from(RoutingInputs {
+            context: "routing".to_string(),
+            candidates: Vec::new(),
+        });
+
+        let prepared = prepare_install_phase("ripgrep", result, &args, &ctx, &engine, &routing);
         assert!(prepared.is_none());
     }
 
@@ -1852,6 +2028,26 @@ mod tests {
         }
     }
 
+    #[test]
+    fn platform_resolution_checks_each_fallback_attr_once() {
+        let primary = source_result("roc", PackageSource::Nxs, Some("roc"));
+        let candidates = vec![
+            primary.clone(),
+            source_result("roc-lang", PackageSource::Nxs, Some("roc-nightly")),
+            source_result("roc", PackageSource::Nxs, Some("roc-nightly")),
+            source_result("roc", PackageSource::Nxs, Some("roc")),
+        ];
+
+        let mut checked = Vec::new();
+        let outcome = resolve_platform_candidate_with(&primary, &candidates, |attr| {
+            checked.push(attr.to_string());
+            (false, None)
+        });
+
+        assert!(outcome.is_err());
+        assert_eq!(checked, vec!["roc", "roc-nightly"]);
+    }
+
     #[test]
     fn platform_resolution_errors_without_same_source_fallback() {
         let primary = source_result("roc", PackageSource::Nxs, Some("roc"));
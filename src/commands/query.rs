@@ -1,3 +1,4 @@
+use std::fmt::Write as _;
 use std::fs;
 use std::path::Path;
 
@@ -13,7 +14,7 @@ use crate::domain::location::PackageLocation;
 use crate::domain::source::{
     OVERLAY_PACKAGES, PackageSource, SourcePreferences, SourceResult, normalize_name,
 };
-use crate::infra::cache::MultiSourceCache;
+use crate::infra::cache::{EVAL_TTL, MultiSourceCache, cached_json_command};
 use crate::infra::config_scan::{PackageBuckets, collect_nix_files, scan_packages};
 use crate::infra::finder::{PackageMatch, find_package, find_package_fuzzy};
 use crate::infra::query_info::{
@@ -24,6 +25,22 @@ use crate::infra::sources::search_all_sources_quiet;
 use crate::output::json::to_string_compact;
 use crate::output::printer::Printer;
 
+/// Accepted `--source` spellings and the package bucket each one selects.
+const SOURCE_FILTER_ALIASES: &[(&str, &str)] = &[
+    ("nix", "nxs"),
+    ("nxs", "nxs"),
+    ("brew", "brews"),
+    ("brews", "brews"),
+    ("homebrew", "brews"),
+    ("cask", "casks"),
+    ("casks", "casks"),
+    ("mas", "mas"),
+    ("service", "services"),
+    ("services", "services"),
+];
+
+/// The sorted `SOURCE_FILTER_ALIASES` spellings, fixed at compile time so the
+/// error path prints a constant instead of collecting and sorting them.
 const VALID_SOURCES_TEXT: &str =
     "  Valid sources: brew, brews, cask, casks, homebrew, mas, nix, nxs, service,\n  services";
 
@@ -44,8 +61,7 @@ pub fn cmd_where(args: &WhereArgs, ctx: &AppContext) -> i32 {
         }
         Ok(None) => {
             ctx.printer.error(&format!("{package} not found"));
-            println!();
-            Printer::detail(&format!("Try: nx info {package}"));
+            Printer::detail_spaced(&format_args!("Try: nx info {package}"));
         }
         Err(err) => {
             ctx.printer.error(&format!("where lookup failed: {err}"));
@@ -81,11 +97,11 @@ pub fn cmd_list(args: &ListArgs, ctx: &AppContext) -> i32 {
     }
 
     if let Some(source_key) = source {
-        let mut only = source_values(source_key, &buckets).to_vec();
+        let mut only = source_values(source_key, &buckets)
+            .iter()
+            .collect::<Vec<_>>();
         only.sort();
-        for package in &only {
-            println!("  {package}");
-        }
+        Printer::indented_lines("  ", only);
         return 0;
     }
 
@@ -147,10 +163,9 @@ pub fn cmd_info(args: &InfoArgs, ctx: &AppContext) -> i32 {
     );
     let flakehub = collect_info_flakehub(package, args.bleeding_edge, search_flakehub);
 
-    println!();
-    Printer::detail(&format!("{package} ({status})"));
+    Printer::detail_spaced(&format_args!("{package} ({status})"));
     if let Some(location) = location.as_ref() {
-        Printer::detail(&format!(
+        Printer::detail(&format_args!(
             "Location: {}",
             relative_location(location, &ctx.repo_root)
         ));
@@ -161,8 +176,7 @@ pub fn cmd_info(args: &InfoArgs, ctx: &AppContext) -> i32 {
 
     if location.is_none() && info_sources.is_empty() && flakehub.is_empty() {
         ctx.printer.error(&format!("{package} not found"));
-        println!();
-        Printer::detail(&format!("Try: nx {package}"));
+        Printer::detail_spaced(&format_args!("Try: nx {package}"));
         return 0;
     }
 
@@ -350,19 +364,19 @@ fn info_source_label(source: &SourceResult) -> String {
 
 fn render_info_metadata_plain(source: &InfoSourceJson) {
     if let Some(value) = source.version.as_deref() {
-        println!("  {:<13} {value}", "Version:");
+        println!("  Version:      {value}");
     }
     if let Some(value) = source.description.as_deref() {
-        println!("  {:<13} {value}", "Description:");
+        println!("  Description:  {value}");
     }
     if let Some(value) = source.homepage.as_deref() {
-        println!("  {:<13} {value}", "Homepage:");
+        println!("  Homepage:     {value}");
     }
     if let Some(value) = source.license.as_deref() {
-        println!("  {:<13} {value}", "License:");
+        println!("  License:      {value}");
     }
     if source.head_available {
-        println!("  {:<13} Available (brew install --HEAD)", "HEAD build:");
+        println!("  HEAD build:   Available (brew install --HEAD)");
     }
 }
 
@@ -390,7 +404,7 @@ fn render_info_dependencies_plain(source: &InfoSourceJson) {
         } else {
             String::new()
         };
-        println!("  {:<13} {shown}{more}", "Dependencies:");
+        println!("  Dependencies: {shown}{more}");
     }
 
     if let Some(build_dependencies) = source.build_dependencies.as_ref()
@@ -407,7 +421,7 @@ fn render_info_dependencies_plain(source: &InfoSourceJson) {
         } else {
             String::new()
         };
-        println!("  {:<13} {shown}{more}", "Build deps:");
+        println!("  Build deps:   {shown}{more}");
     }
 }
 
@@ -421,7 +435,7 @@ fn render_info_artifacts_plain(source: &InfoSourceJson) {
             .cloned()
             .collect::<Vec<_>>()
             .join(", ");
-        println!("  {:<13} {shown}", "Installs:");
+        println!("  Installs:     {shown}");
     }
 }
 
@@ -493,24 +507,31 @@ fn render_install_hints_plain(name: &str, infos: &[SourceResult], installed: boo
         return;
     }
 
-    println!("  Available from multiple sources. Install with:");
-    for info in infos {
-        let hint = install_hint_for_source(name, info.source);
-        println!("  {hint}");
-    }
+    let hints = infos
+        .iter()
+        .map(|info| format!("  nx {}{name}", install_flag(info.source)));
+    Printer::lines(
+        std::iter::once("  Available from multiple sources. Install with:".to_string())
+            .chain(hints),
+    );
 }
 
-fn install_hint_for_source(name: &str, source: PackageSource) -> String {
+/// Flag prefix `nx` needs to install from `source`; each hint is then a
+/// single format instead of a per-source format wrapped in another.
+const fn install_flag(source: PackageSource) -> &'static str {
     match source {
-        PackageSource::Nxs => format!("nx {name}"),
-        PackageSource::Nur => format!("nx --nur {name}"),
-        PackageSource::Homebrew => format!("nx --source homebrew {name}"),
-        PackageSource::Cask => format!("nx --cask {name}"),
-        PackageSource::Mas => format!("nx --mas {name}"),
-        PackageSource::FlakeInput => format!("nx --bleeding-edge {name}"),
+        PackageSource::Nxs => "",
+        PackageSource::Nur => "--nur ",
+        PackageSource::Homebrew => "--source homebrew ",
+        PackageSource::Cask => "--cask ",
+        PackageSource::Mas => "--mas ",
+        PackageSource::FlakeInput => "--bleeding-edge ",
     }
 }
 
+/// Column header for `nx status`.
+const STATUS_COLUMNS: &str = "\n  Source       Count  Examples";
+
 pub fn cmd_status(ctx: &AppContext) -> i32 {
     let buckets = match scan_packages(&ctx.repo_root) {
         Ok(buckets) => buckets,
@@ -520,32 +541,22 @@ pub fn cmd_status(ctx: &AppContext) -> i32 {
         }
     };
 
-    let total = [
-        buckets.nxs.len(),
-        buckets.brews.len(),
-        buckets.casks.len(),
-        buckets.mas.len(),
-        buckets.services.len(),
-    ]
-    .into_iter()
-    .sum::<usize>();
-
-    println!("\n  Package Status ({total} packages installed)");
-    println!("\n  Source       Count  Examples");
-
-    for (label, packages) in [
-        ("nxs", &buckets.nxs),
-        ("homebrew", &buckets.brews),
-        ("casks", &buckets.casks),
-        ("Mac App Store", &buckets.mas),
-        ("services", &buckets.services),
-    ] {
-        if packages.is_empty() {
-            continue;
-        }
-        let examples = render_examples(packages);
-        println!("  {label:<12} {:>5}  {examples}", packages.len());
+    // One summary table feeds both the total and the rows.
+    let summaries = [
+        SourceSummary::new("nxs", &buckets.nxs),
+        SourceSummary::new("homebrew", &buckets.brews),
+        SourceSummary::new("casks", &buckets.casks),
+        SourceSummary::new("Mac App Store", &buckets.mas),
+        SourceSummary::new("services", &buckets.services),
+    ];
+    let total = summaries.iter().map(|summary| summary.count).sum::<usize>();
+
+    // Rows are written straight into one buffer and emitted with a single write.
+    let mut out = format!("\n  Package Status ({total} packages installed)\n{STATUS_COLUMNS}\n");
+    for summary in summaries.iter().filter(|summary| summary.count > 0) {
+        summary.push_row(&mut out);
     }
+    print!("{out}");
 
     0
 }
@@ -667,10 +678,8 @@ fn render_single_installed(result: &InstalledResult, ctx: &AppContext, show_loca
 }
 
 fn render_multi_installed(results: &[InstalledResult], ctx: &AppContext) -> i32 {
-    let all_installed = results.iter().all(|r| r.matched.is_some());
     let installed_count = results.iter().filter(|r| r.matched.is_some()).count();
-    println!();
-    Printer::detail(&format!(
+    Printer::detail_spaced(&format_args!(
         "Package Check ({installed_count}/{} installed)",
         results.len()
     ));
@@ -684,24 +693,20 @@ fn render_multi_installed(results: &[InstalledResult], ctx: &AppContext) -> i32
                 ctx.printer
                     .success(&format!("{} → {}", result.query, found.name));
             }
-            Printer::detail(&format!("  {rel}"));
+            Printer::detail(&format_args!("  {rel}"));
         } else {
             ctx.printer
                 .warn(&format!("{} is not installed", result.query));
         }
     }
-    i32::from(!all_installed)
+    i32::from(installed_count != results.len())
 }
 
 fn normalize_source_filter(value: &str) -> Option<&'static str> {
-    match value.to_ascii_lowercase().as_str() {
-        "nix" | "nxs" => Some("nxs"),
-        "brew" | "brews" | "homebrew" => Some("brews"),
-        "cask" | "casks" => Some("casks"),
-        "mas" => Some("mas"),
-        "service" | "services" => Some("services"),
-        _ => None,
-    }
+    SOURCE_FILTER_ALIASES
+        .iter()
+        .find(|(alias, _)| alias.eq_ignore_ascii_case(value))
+        .map(|&(_, key)| key)
 }
 
 fn source_values<'a>(source: &str, buckets: &'a PackageBuckets) -> &'a [String] {
@@ -715,21 +720,53 @@ fn source_values<'a>(source: &str, buckets: &'a PackageBuckets) -> &'a [String]
     }
 }
 
-fn render_examples(packages: &[String]) -> String {
-    let mut sorted = packages.to_vec();
-    sorted.sort();
+/// Per-source count plus the few names `nx status` shows, so rendering never
+/// walks the full package list.
+struct SourceSummary<'a> {
+    label: &'static str,
+    count: usize,
+    examples: Vec<&'a str>,
+}
+
+impl<'a> SourceSummary<'a> {
+    const EXAMPLES: usize = 4;
 
-    let mut examples = sorted.into_iter().take(4).collect::<Vec<_>>().join(", ");
-    if packages.len() > 4 {
-        if !examples.is_empty() {
-            examples.push_str(", ");
+    fn new(label: &'static str, packages: &'a [String]) -> Self {
+        Self {
+            label,
+            count: packages.len(),
+            examples: smallest_names(packages, Self::EXAMPLES),
+        }
+    }
+
+    fn push_row(&self, out: &mut String) {
+        let _ = write!(out, "  {:<12} {:>5}  ", self.label, self.count);
+        for (idx, name) in self.examples.iter().enumerate() {
+            if idx > 0 {
+                out.push_str(", ");
+            }
+            out.push_str(name);
+        }
+        if self.count > self.examples.len() {
+            out.push_str(", ...");
         }
-        examples.push_str("...");
+        out.push('\n');
     }
-    examples
+}
+
+/// The `n` lexicographically smallest names, sorted, via partial selection.
+fn smallest_names(packages: &[String], n: usize) -> Vec<&str> {
+    let mut smallest = packages.iter().map(String::as_str).collect::<Vec<_>>();
+    if n > 0 && smallest.len() > n {
+        smallest.select_nth_unstable(n - 1);
+        smallest.truncate(n);
+    }
+    smallest.sort_unstable();
+    smallest
 }
 
 fn print_plain_list(buckets: &PackageBuckets) {
+    let mut names = Vec::new();
     for source in [
         &buckets.nxs,
         &buckets.brews,
@@ -737,12 +774,11 @@ fn print_plain_list(buckets: &PackageBuckets) {
         &buckets.mas,
         &buckets.services,
     ] {
-        let mut packages = source.clone();
-        packages.sort();
-        for package in &packages {
-            println!("  {package}");
-        }
+        let first = names.len();
+        names.extend(source.iter().map(String::as_str));
+        names[first..].sort_unstable();
     }
+    Printer::indented_lines("  ", names);
 }
 
 #[derive(Serialize)]
@@ -957,19 +993,25 @@ struct BrewCaskMetadata {
     artifacts: Option<Vec<String>>,
 }
 
+/// Fields `nix info` reads from a package, fetched by a single `nix eval`
+/// rather than one evaluator start per field. A package without `meta` fails
+/// the evaluation so the next target is tried.
+const NIX_INFO_FIELDS: &str = "p: { version = p.version or null; meta = p.meta; }";
+
 fn nix_info_metadata(attr: &str) -> Option<NixInfoMetadata> {
-    let mut meta = NixInfoMetadata {
-        version: eval_nix_attr(attr, "version").and_then(|value| json_to_string(&value)),
-        ..NixInfoMetadata::default()
-    };
+    nix_info_from_eval(&eval_nix_attr(attr, NIX_INFO_FIELDS)?)
+}
 
-    let meta_json = eval_nix_attr(attr, "meta")?;
-    meta.description = json_field_string(&meta_json, "description");
-    meta.homepage = json_field_string(&meta_json, "homepage");
-    meta.license = json_field_license(&meta_json);
-    meta.broken = json_field_bool(&meta_json, "broken");
-    meta.insecure = json_field_bool(&meta_json, "insecure");
-    Some(meta)
+fn nix_info_from_eval(info: &Value) -> Option<NixInfoMetadata> {
+    let meta_json = info.get("meta")?;
+    Some(NixInfoMetadata {
+        version: json_field_string(info, "version"),
+        description: json_field_string(meta_json, "description"),
+        homepage: json_field_string(meta_json, "homepage"),
+        license: json_field_license(meta_json),
+        broken: json_field_bool(meta_json, "broken"),
+        insecure: json_field_bool(meta_json, "insecure"),
+    })
 }
 
 fn brew_formula_metadata(name: &str) -> Option<BrewFormulaMetadata> {
@@ -1001,10 +1043,12 @@ fn brew_cask_metadata(name: &str) -> Option<BrewCaskMetadata> {
     })
 }
 
-fn eval_nix_attr(attr: &str, suffix: &str) -> Option<Value> {
+/// Evaluate `apply` against a package attribute, trying each target in order.
+fn eval_nix_attr(attr: &str, apply: &str) -> Option<Value> {
     for target in ["nxs", "nixpkgs", "github:nixos/nixpkgs/nixos-unstable"] {
-        let query = format!("{target}#{attr}.{suffix}");
-        if let Some(value) = run_json_command_quiet("nix", &["eval", "--json", &query]) {
+        let installable = format!("{target}#{attr}");
+        let args = ["eval", "--json", &installable, "--apply", apply];
+        if let Some(value) = cached_json_command("nix", &args, EVAL_TTL) {
             return Some(value);
         }
     }
@@ -1018,10 +1062,11 @@ fn brew_info_entry(name: &str, is_cask: bool) -> Option<Value> {
     }
     args.push(name);
     let key = if is_cask { "casks" } else { "formulae" };
-    let data = run_json_command_quiet("brew", &args)?;
-    data.get(key)
-        .and_then(Value::as_array)
-        .and_then(|entries| entries.first().cloned())
+    let mut data = run_json_command_quiet("brew", &args)?;
+    match data.get_mut(key).map(Value::take) {
+        Some(Value::Array(entries)) => entries.into_iter().next(),
+        _ => None,
+    }
 }
 
 fn json_field_string(value: &Value, key: &str) -> Option<String> {
@@ -1298,6 +1343,32 @@ mod tests {
         );
     }
 
+    #[test]
+    fn nix_info_from_eval_reads_version_and_meta_from_one_result() {
+        let info = serde_json::json!({
+            "version": "14.1.1",
+            "meta": {
+                "description": "fast grep",
+                "homepage": "https://github.com/BurntSushi/ripgrep",
+                "license": [{"spdxId": "MIT"}],
+                "broken": false,
+                "insecure": true
+            }
+        });
+
+        let meta = nix_info_from_eval(&info).expect("meta should be present");
+        assert_eq!(meta.version.as_deref(), Some("14.1.1"));
+        assert_eq!(meta.description.as_deref(), Some("fast grep"));
+        assert_eq!(meta.license.as_deref(), Some("MIT"));
+        assert!(!meta.broken);
+        assert!(meta.insecure);
+
+        let unversioned = serde_json::json!({"version": null, "meta": {}});
+        let meta = nix_info_from_eval(&unversioned).expect("meta should be present");
+        assert_eq!(meta.version, None);
+        assert!(nix_info_from_eval(&serde_json::json!({"version": "1"})).is_none());
+    }
+
     #[test]
     fn info_source_label_uses_nix_attr_display() {
         let source = source_result("ripgrep", PackageSource::Nxs, Some("ripgrep"), 1.0);
@@ -1359,6 +1430,40 @@ mod tests {
         assert_eq!(results[2].name, "Org/c");
     }
 
+    #[test]
+    fn source_summary_row_shows_count_and_four_smallest_names() {
+        let packages = ["zsh", "fd", "jq", "bat", "ripgrep", "eza"]
+            .into_iter()
+            .map(str::to_string)
+            .collect::<Vec<_>>();
+        let mut out = String::new();
+        SourceSummary::new("nxs", &packages).push_row(&mut out);
+        assert_eq!(out, "  nxs              6  bat, eza, fd, jq, ...\n");
+
+        out.clear();
+        SourceSummary::new("casks", &packages[..2]).push_row(&mut out);
+        assert_eq!(out, "  casks            2  fd, zsh\n");
+    }
+
+    #[test]
+    fn valid_sources_text_lists_every_filter_alias_in_order() {
+        let mut aliases = SOURCE_FILTER_ALIASES
+            .iter()
+            .map(|&(alias, _)| alias)
+            .collect::<Vec<_>>();
+        aliases.sort_unstable();
+        let listed = VALID_SOURCES_TEXT
+            .trim_start()
+            .strip_prefix("Valid sources: ")
+            .expect("text should open with its label")
+            .split(',')
+            .map(str::trim)
+            .collect::<Vec<_>>();
+        assert_eq!(listed, aliases);
+        assert_eq!(normalize_source_filter("HomeBrew"), Some("brews"));
+        assert_eq!(normalize_source_filter("flake"), None);
+    }
+
     fn package_from_args(args: &InfoArgs) -> &str {
         args.package
             .as_deref()
@@ -41,8 +41,9 @@ fn remove_single_package(package: &str, args: &RemoveArgs, ctx: &AppContext) ->
         Ok(Some(location)) => location,
         Ok(None) => {
             ctx.printer.error(&format!("{package} not found"));
-            println!();
-            Printer::detail(&format!("Check installed: nx list | grep -i {package}"));
+            Printer::detail_spaced(&format_args!(
+                "Check installed: nx list | grep -i {package}"
+            ));
             return Ok(());
         }
         Err(err) => {
@@ -52,7 +53,7 @@ fn remove_single_package(package: &str, args: &RemoveArgs, ctx: &AppContext) ->
     };
 
     ctx.printer.action(&format!("Removing {package}"));
-    Printer::detail(&format!(
+    Printer::detail(&format_args!(
         "Location: {}",
         relative_location(&location, &ctx.repo_root)
     ));
@@ -80,7 +81,7 @@ fn remove_with_line(
 
     if !args.yes {
         println!();
-        if !Printer::confirm(&format!("Remove {package}?"), false) {
+        if !Printer::confirm(&format_args!("Remove {package}?"), false) {
             Printer::detail("Cancelled.");
             return Ok(());
         }
@@ -111,14 +112,14 @@ fn remove_via_ai(
     let prompt = build_remove_prompt(package, &rel_path);
 
     if args.dry_run {
-        Printer::detail(&format!("[DRY RUN] Would run AI to remove {package}"));
+        Printer::detail(&format_args!("[DRY RUN] Would run AI to remove {package}"));
         println!("\n- Would remove {package}");
         return Ok(());
     }
 
     if !args.yes {
         println!();
-        if !Printer::confirm(&format!("Remove {package}?"), false) {
+        if !Printer::confirm(&format_args!("Remove {package}?"), false) {
             Printer::detail("Cancelled.");
             return Ok(());
         }
@@ -126,7 +127,7 @@ fn remove_via_ai(
 
     let before_diff = git_diff(&ctx.repo_root);
 
-    Printer::detail(&format!("Analyzing removal of {package}"));
+    Printer::detail(&format_args!("Analyzing removal of {package}"));
 
     let engine = ClaudeEngine::new(args.model.as_deref());
     let mut deterministic_edit: Option<EditOutcome> = None;
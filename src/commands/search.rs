@@ -1,3 +1,5 @@
+use std::fmt::Write as _;
+
 use crate::cli::SearchArgs;
 use crate::commands::context::AppContext;
 use crate::domain::source::{SourcePreferences, SourceResult};
@@ -65,19 +67,24 @@ fn render_table(results: &[SourceResult], ctx: &AppContext) {
         .action(&format!("Results for '{}'", results[0].name));
     println!();
 
+    let mut out = String::new();
     for r in results {
-        let attr_display = r.attr.as_deref().unwrap_or(&r.name);
-        let version = r
-            .version
-            .as_deref()
-            .map(|v| format!(" ({v})"))
-            .unwrap_or_default();
-        let desc = if r.description.is_empty() {
-            String::new()
-        } else {
-            format!(" - {}", r.description)
-        };
+        push_result_row(&mut out, r);
+    }
+    print!("{out}");
+}
 
-        println!("  {:<12} {attr_display}{version}{desc}", r.source,);
+/// One search result row; optional fields are appended in place rather than
+/// formatted into temporary Strings first.
+fn push_result_row(out: &mut String, r: &SourceResult) {
+    let attr_display = r.attr.as_deref().unwrap_or(&r.name);
+    let _ = write!(out, "  {:<12} {attr_display}", r.source);
+    if let Some(version) = r.version.as_deref() {
+        let _ = write!(out, " ({version})");
+    }
+    if !r.description.is_empty() {
+        out.push_str(" - ");
+        out.push_str(&r.description);
     }
+    out.push('\n');
 }
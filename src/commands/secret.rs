@@ -47,7 +47,7 @@ fn cmd_secret_add(args: &SecretAddArgs, ctx: &AppContext) -> i32 {
     } else {
         Printer::detail("home/secrets.nix already contained this key.");
     }
-    Printer::detail(&format!(
+    Printer::detail(&format_args!(
         "Run `nx rebuild` so new shells expose ${}.",
         to_env_var_name(key)
     ));
@@ -1,7 +1,12 @@
+use std::borrow::Cow;
+use std::fmt::Write as _;
 use std::fs;
-use std::path::Path;
+use std::io::{BufRead, BufReader};
+use std::path::{Path, PathBuf};
+use std::sync::Mutex;
 
 use crate::domain::location::PackageLocation;
+use crate::output::printer::Printer;
 
 pub fn relative_location(location: &PackageLocation, repo_root: &Path) -> String {
     let full_path = location.path().display().to_string();
@@ -24,14 +29,21 @@ pub fn missing_argument_error(command: &str, argument: &str) -> i32 {
 }
 
 fn strip_repo_prefix(path: &str, repo_root: &Path) -> String {
-    let canonical = fs::canonicalize(repo_root).ok();
-    let prefixes: Vec<String> = canonical
-        .iter()
-        .map(|p| format!("{}/", p.display()))
-        .chain(std::iter::once(format!("{}/", repo_root.display())))
-        .collect();
+    // Every location shown by a command is relativized against the same root,
+    // so the canonicalized prefixes are resolved once and reused until the
+    // root changes.
+    static PREFIXES: Mutex<Option<(PathBuf, Vec<String>)>> = Mutex::new(None);
+    let mut cached = PREFIXES
+        .lock()
+        .expect("repo prefix cache lock should not be poisoned");
+    if cached.as_ref().is_none_or(|(root, _)| root != repo_root) {
+        *cached = Some((repo_root.to_path_buf(), repo_prefixes(repo_root)));
+    }
+    let prefixes = cached
+        .as_ref()
+        .map_or(&[][..], |(_, prefixes)| prefixes.as_slice());
 
-    for prefix in &prefixes {
+    for prefix in prefixes {
         if let Some(stripped) = path.strip_prefix(prefix.as_str()) {
             return stripped.to_string();
         }
@@ -39,6 +51,18 @@ fn strip_repo_prefix(path: &str, repo_root: &Path) -> String {
     path.to_string()
 }
 
+fn repo_prefixes(repo_root: &Path) -> Vec<String> {
+    fs::canonicalize(repo_root)
+        .ok()
+        .iter()
+        .map(|p| format!("{}/", p.display()))
+        .chain(std::iter::once(format!("{}/", repo_root.display())))
+        .collect()
+}
+
+/// Bottom border shared by every snippet box.
+const SNIPPET_FOOTER: &str = "  └────────────────────────────────────────";
+
 #[derive(Clone, Copy)]
 pub enum SnippetMode {
     Add,
@@ -56,26 +80,20 @@ pub fn show_snippet(
         return;
     }
 
-    let Ok(file_content) = fs::read_to_string(file_path) else {
+    let start = line_num.saturating_sub(context + 1);
+    let Some(lines) = read_line_window(file_path, start, line_num + context) else {
         return;
     };
-
-    let lines: Vec<&str> = file_content.lines().collect();
-    let start = line_num.saturating_sub(context + 1);
-    let end = usize::min(lines.len(), line_num + context);
-    if start >= end {
+    if lines.is_empty() {
         return;
     }
 
-    let file_name = file_path
-        .file_name()
-        .and_then(|name| name.to_str())
-        .map_or_else(|| file_path.display().to_string(), str::to_string);
+    let file_name = snippet_file_name(file_path);
     let header_suffix = if preview { " (preview)" } else { "" };
 
-    println!();
-    println!("  ┌── {file_name}{header_suffix} ───");
-    for (offset, line) in lines[start..end].iter().enumerate() {
+    // The whole box is rendered into one buffer and emitted as one block.
+    let mut out = format!("\n  ┌── {file_name}{header_suffix} ───\n");
+    for (offset, line) in lines.iter().enumerate() {
         let number = start + offset + 1;
         let is_target = number == line_num;
         let marker = match (mode, is_target) {
@@ -83,9 +101,11 @@ pub fn show_snippet(
             (SnippetMode::Remove, true) => "-",
             _ => " ",
         };
-        println!("  │ {marker} {number:4} │ {line}");
+        let _ = writeln!(out, "  │ {marker} {number:4} │ {line}");
     }
-    println!("  └{}", "─".repeat(40));
+    out.push_str(SNIPPET_FOOTER);
+    out.push('\n');
+    Printer::write_block(&out);
 }
 
 pub fn show_dry_run_preview(
@@ -98,56 +118,77 @@ pub fn show_dry_run_preview(
         return;
     }
 
-    let Ok(file_content) = fs::read_to_string(file_path) else {
+    let start = insert_after_line.saturating_sub(context + 1);
+    let Some(lines) = read_line_window(file_path, start, insert_after_line + context) else {
         return;
     };
-    let lines: Vec<&str> = file_content.lines().collect();
     if lines.is_empty() {
         return;
     }
 
-    let start = insert_after_line.saturating_sub(context + 1);
-    let end = usize::min(lines.len(), insert_after_line + context);
-    if start >= end {
-        return;
-    }
-
-    let inferred_indent = lines[start..end]
+    // The indent is borrowed straight from the neighbouring line rather than
+    // collected char by char into its own String.
+    let inferred_indent = lines
         .iter()
         .find_map(|line| {
-            let trimmed = line.trim();
-            if trimmed.is_empty() || trimmed.starts_with('#') {
+            let body = line.trim_start();
+            if body.trim_end().is_empty() || body.starts_with('#') {
                 return None;
             }
-            Some(
-                line.chars()
-                    .take_while(|c| c.is_whitespace())
-                    .collect::<String>(),
-            )
+            Some(&line[..line.len() - body.len()])
         })
         .unwrap_or_default();
-    let simulated = format!("{}{}", inferred_indent, simulated_line.trim_start());
-
-    let file_name = file_path
-        .file_name()
-        .and_then(|name| name.to_str())
-        .map_or_else(|| file_path.display().to_string(), str::to_string);
-
-    println!();
-    println!("  ┌── {file_name} (preview) ───");
-    for (idx, line) in lines.iter().enumerate().take(end).skip(start) {
-        println!("  │   {:4} │ {line}", idx + 1);
-        if idx + 1 == insert_after_line {
-            println!("  │ +      │ {simulated}");
+    let simulated = format!("{inferred_indent}{}", simulated_line.trim_start());
+
+    let file_name = snippet_file_name(file_path);
+
+    let mut out = format!("\n  ┌── {file_name} (preview) ───\n");
+    for (offset, line) in lines.iter().enumerate() {
+        let number = start + offset + 1;
+        let _ = writeln!(out, "  │   {number:4} │ {line}");
+        if number == insert_after_line {
+            let _ = writeln!(out, "  │ +      │ {simulated}");
+        }
+    }
+    out.push_str(SNIPPET_FOOTER);
+    out.push('\n');
+    Printer::write_block(&out);
+}
+
+/// Name shown in a snippet header: the bare file name, borrowed when it is
+/// valid UTF-8, or the whole path when there is none.
+fn snippet_file_name(path: &Path) -> Cow<'_, str> {
+    match path.file_name().and_then(|name| name.to_str()) {
+        Some(name) => Cow::Borrowed(name),
+        None => Cow::Owned(path.display().to_string()),
+    }
+}
+
+/// Lines `start..end` (zero-based) of a file, reading no further than `end`.
+///
+/// Previews show a handful of lines around a target, so only the lines up to
+/// the window are scanned and only the window itself is kept.
+fn read_line_window(path: &Path, start: usize, end: usize) -> Option<Vec<String>> {
+    let mut reader = BufReader::new(fs::File::open(path).ok()?);
+    let mut skipped = Vec::new();
+    for _ in 0..start {
+        skipped.clear();
+        if reader.read_until(b'\n', &mut skipped).ok()? == 0 {
+            return Some(Vec::new());
         }
     }
-    println!("  └{}", "─".repeat(40));
+    reader
+        .lines()
+        .take(end.saturating_sub(start))
+        .collect::<Result<_, _>>()
+        .ok()
 }
 
 #[cfg(test)]
 mod tests {
-    use super::relative_location;
+    use super::{read_line_window, relative_location};
     use crate::domain::location::PackageLocation;
+    use std::fs;
     use std::path::PathBuf;
     use tempfile::TempDir;
 
@@ -171,4 +212,25 @@ mod tests {
         let rendered = relative_location(&location, repo_root);
         assert_eq!(rendered, format!("{}:7", outside.display()));
     }
+
+    #[test]
+    fn read_line_window_returns_only_requested_lines() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let path = tmp.path().join("packages.nix");
+        fs::write(&path, "one\ntwo\r\nthree\nfour\n").expect("file should be written");
+
+        assert_eq!(
+            read_line_window(&path, 1, 3).expect("window should be read"),
+            vec!["two", "three"]
+        );
+        assert_eq!(
+            read_line_window(&path, 2, 10).expect("window should be read"),
+            vec!["three", "four"]
+        );
+        assert!(
+            read_line_window(&path, 8, 10)
+                .expect("window should be read")
+                .is_empty()
+        );
+    }
 }
@@ -27,8 +27,8 @@ use self::undo::{git_diff_stat, git_modified_files};
 use self::upgrade::{
     brew_compare_url, build_nix_update_command, flake_compare_endpoint, flake_compare_url,
     github_owner_repo, is_cache_corruption, is_fd_exhaustion, maybe_ai_summary,
-    parse_ai_summary_output, parse_brew_info_json, parse_brew_outdated_json, parse_compare_json,
-    should_use_detailed_ai_summary,
+    mentions_nothing_to_commit, parse_ai_summary_output, parse_brew_info_json,
+    parse_brew_outdated_json, parse_compare_json, should_use_detailed_ai_summary,
 };
 
 #[cfg(test)]
@@ -407,6 +407,13 @@ mod tests {
         assert!(parsed.len() <= 30);
     }
 
+    #[test]
+    fn parse_ai_summary_output_truncates_on_char_boundary() {
+        let parsed = parse_ai_summary_output("caf\u{e9} caf\u{e9} caf\u{e9}", 1, 8)
+            .expect("summary should parse");
+        assert_eq!(parsed, "caf\u{e9}...");
+    }
+
     // --- changelog URL derivation ---
 
     #[test]
@@ -480,6 +487,19 @@ mod tests {
         assert!(!is_cache_corruption(""));
     }
 
+    // --- mentions_nothing_to_commit ---
+
+    #[test]
+    fn nothing_to_commit_detected_case_insensitively() {
+        assert!(mentions_nothing_to_commit(
+            b"On branch main\nNothing To Commit, working tree clean\n"
+        ));
+        assert!(!mentions_nothing_to_commit(
+            b"error: pathspec did not match"
+        ));
+        assert!(!mentions_nothing_to_commit(b""));
+    }
+
     // --- build_nix_update_command ---
 
     #[test]
@@ -493,10 +513,11 @@ mod tests {
     fn build_command_with_ulimit() {
         let args = vec!["flake".into(), "update".into()];
         let result = build_nix_update_command(&args, Some(8192));
-        assert_eq!(result.len(), 2);
-        assert_eq!(result[0], "-lc");
+        assert_eq!(result.len(), 5);
+        assert_eq!(result[0], "-c");
         assert!(result[1].contains("ulimit -n 8192"));
-        assert!(result[1].contains("exec nix flake update"));
+        assert!(result[1].contains("exec nix \"$@\""));
+        assert_eq!(result[3..], ["flake", "update"]);
     }
 
     // --- build_rebuild_command ---
@@ -80,13 +80,11 @@ fn check_git_preflight(ctx: &AppContext) -> Result<(), i32> {
 
     ctx.printer
         .error("Untracked .nix files would be ignored by flake evaluation");
-    println!();
-    Printer::detail("Track these files before rebuild:");
+    Printer::detail_spaced("Track these files before rebuild:");
     for rel_path in &untracked {
-        Printer::detail(&format!("- {rel_path}"));
+        Printer::detail(&format_args!("- {rel_path}"));
     }
-    println!();
-    Printer::detail(&format!(
+    Printer::detail_spaced(&format_args!(
         "Run: git -C \"{}\" add <files>",
         ctx.repo_root.display()
     ));
@@ -119,7 +117,10 @@ fn check_flake(ctx: &AppContext) -> Result<(), i32> {
 }
 
 fn do_rebuild(args: &PassthroughArgs, ctx: &AppContext) -> i32 {
+    // The command is identical on every attempt; only the cache is cleared.
     let repo = ctx.repo_root.display().to_string();
+    let rebuild_cmd = build_rebuild_command(&repo, args);
+    let arg_refs: Vec<&str> = rebuild_cmd.iter().map(String::as_str).collect();
 
     for attempt in 0..3 {
         if attempt == 0 {
@@ -129,9 +130,6 @@ fn do_rebuild(args: &PassthroughArgs, ctx: &AppContext) -> i32 {
         }
         println!();
 
-        let rebuild_cmd = build_rebuild_command(&repo, args);
-        let arg_refs: Vec<&str> = rebuild_cmd.iter().map(String::as_str).collect();
-
         let (code, output) =
             match run_indented_command_collecting("sudo", &arg_refs, None, &ctx.printer, "  ") {
                 Ok(result) => result,
@@ -5,7 +5,7 @@ use crate::commands::context::AppContext;
 use crate::domain::upgrade::{InputChange, diff_locks, load_flake_lock, short_rev};
 use crate::infra::ai_engine::DEFAULT_CODEX_MODEL;
 use crate::infra::shell::{
-    run_captured_command, run_indented_command, run_indented_command_collecting,
+    run_captured_command, run_indented_command, run_indented_command_collecting, run_raw_command,
 };
 use crate::output::printer::Printer;
 
@@ -102,10 +102,10 @@ fn run_flake_phase(args: &UpgradeArgs, ctx: &AppContext) -> Result<Vec<InputChan
     }
 
     if !diff.added.is_empty() {
-        Printer::detail(&format!("Added: {}", diff.added.join(", ")));
+        Printer::detail(&format_args!("Added: {}", diff.added.join(", ")));
     }
     if !diff.removed.is_empty() {
-        Printer::detail(&format!("Removed: {}", diff.removed.join(", ")));
+        Printer::detail(&format_args!("Removed: {}", diff.removed.join(", ")));
     }
 
     Ok(diff.changed)
@@ -262,12 +262,7 @@ fn summarize_with_claude(
 }
 
 fn build_codex_summary_prompt(target: &str, commits: &[String]) -> String {
-    let commit_text = commits
-        .iter()
-        .take(30)
-        .map(|commit| format!("- {commit}"))
-        .collect::<Vec<_>>()
-        .join("\n");
+    let commit_text = bullet_list(commits, 30);
 
     format!(
         "Summarize these software update commits for {target} in 1 sentence.\n\
@@ -280,12 +275,7 @@ Summary:"
 }
 
 fn build_claude_summary_prompt(target: &str, commits: &[String]) -> String {
-    let commit_text = commits
-        .iter()
-        .take(40)
-        .map(|commit| format!("- {commit}"))
-        .collect::<Vec<_>>()
-        .join("\n");
+    let commit_text = bullet_list(commits, 40);
 
     format!(
         "Summarize the key upgrade impact for {target} in 2 short sentences.\n\
@@ -336,17 +326,30 @@ fn trim_summary_prefix(line: &str) -> &str {
     line.trim_start_matches(['-', '*', ' ']).trim()
 }
 
+/// Render at most `limit` items as `- item` lines in a single buffer.
+fn bullet_list(items: &[String], limit: usize) -> String {
+    let mut out = String::new();
+    for item in items.iter().take(limit) {
+        if !out.is_empty() {
+            out.push('\n');
+        }
+        out.push_str("- ");
+        out.push_str(item);
+    }
+    out
+}
+
 fn truncate_summary(text: &str, max_chars: usize) -> String {
-    let chars = text.chars().collect::<Vec<_>>();
-    if chars.len() <= max_chars {
+    if text.char_indices().nth(max_chars).is_none() {
         return text.to_string();
     }
 
     let keep = max_chars.saturating_sub(3);
-    let mut shortened = chars.into_iter().take(keep).collect::<String>();
-    while shortened.ends_with(' ') {
-        shortened.pop();
-    }
+    let end = text
+        .char_indices()
+        .nth(keep)
+        .map_or(text.len(), |(idx, _)| idx);
+    let mut shortened = text[..end].trim_end_matches(' ').to_string();
     shortened.push_str("...");
     shortened
 }
@@ -557,16 +560,15 @@ fn enrich_brew_outdated(packages: Vec<BrewOutdatedPackage>) -> Vec<BrewOutdatedP
         return packages;
     }
 
-    let formulae = packages
-        .iter()
-        .filter(|package| !package.is_cask)
-        .map(|package| package.name.as_str())
-        .collect::<Vec<_>>();
-    let casks = packages
-        .iter()
-        .filter(|package| package.is_cask)
-        .map(|package| package.name.as_str())
-        .collect::<Vec<_>>();
+    let mut formulae = Vec::new();
+    let mut casks = Vec::new();
+    for package in &packages {
+        if package.is_cask {
+            casks.push(package.name.as_str());
+        } else {
+            formulae.push(package.name.as_str());
+        }
+    }
 
     let formula_metadata = brew_info_metadata(&formulae, false);
     let cask_metadata = brew_info_metadata(&casks, true);
@@ -711,6 +713,11 @@ fn normalize_version(version: &str) -> &str {
 }
 
 /// Build the nix flake update command, optionally wrapped with a ulimit raise.
+///
+/// The wrapper is a plain non-login `bash -c`: nix already resolves through
+/// the inherited PATH, so sourcing login profiles only adds startup time. The
+/// nix arguments follow as positional parameters rather than being joined
+/// into the script, so none of them needs quoting.
 pub(super) fn build_nix_update_command(
     base_args: &[String],
     raise_nofile: Option<u32>,
@@ -718,14 +725,14 @@ pub(super) fn build_nix_update_command(
     raise_nofile.map_or_else(
         || base_args.to_vec(),
         |limit| {
-            let nix_cmd = std::iter::once("nix".to_string())
-                .chain(base_args.iter().cloned())
-                .collect::<Vec<_>>()
-                .join(" ");
-            vec![
-                "-lc".to_string(),
-                format!("ulimit -n {limit} 2>/dev/null; exec {nix_cmd}"),
+            [
+                "-c".to_string(),
+                format!("ulimit -n {limit} 2>/dev/null; exec nix \"$@\""),
+                "nx".to_string(),
             ]
+            .into_iter()
+            .chain(base_args.iter().cloned())
+            .collect()
         },
     )
 }
@@ -752,7 +759,7 @@ fn stream_nix_update(args: &UpgradeArgs, ctx: &AppContext) -> bool {
     let token = gh_auth_token();
 
     let mut base_args: Vec<String> = vec!["flake".into(), "update".into()];
-    base_args.extend(args.passthrough.clone());
+    base_args.extend(args.passthrough.iter().cloned());
     if !token.is_empty() {
         base_args.extend([
             "--option".into(),
@@ -773,11 +780,12 @@ fn stream_nix_update(args: &UpgradeArgs, ctx: &AppContext) -> bool {
         }
 
         let cmd_args = build_nix_update_command(&base_args, raise_nofile);
-        let (program, arg_refs): (&str, Vec<&str>) = if raise_nofile.is_some() {
-            ("bash", cmd_args.iter().map(String::as_str).collect())
+        let program = if raise_nofile.is_some() {
+            "bash"
         } else {
-            ("nix", cmd_args.iter().map(String::as_str).collect())
+            "nix"
         };
+        let arg_refs = cmd_args.iter().map(String::as_str).collect::<Vec<_>>();
 
         let (code, output) = match run_indented_command_collecting(
             program,
@@ -857,21 +865,15 @@ fn clear_tarball_pack_cache() {
 fn commit_flake_lock(ctx: &AppContext, flake_changes: &[InputChange]) {
     let repo = ctx.repo_root.display().to_string();
     let message = build_upgrade_commit_message(flake_changes);
-    let _ = run_captured_command("git", &["-C", &repo, "add", "flake.lock"], None);
-    let result = run_captured_command("git", &["-C", &repo, "commit", "-m", &message], None);
+    let _ = run_raw_command("git", &["-C", &repo, "add", "flake.lock"], None);
+    let result = run_raw_command("git", &["-C", &repo, "commit", "-m", &message], None);
     match result {
-        Ok(cmd) if cmd.code == 0 => {
+        Ok(output) if output.status.success() => {
             ctx.printer.success(&format!("Committed: {message}"));
         }
-        Ok(cmd)
-            if cmd
-                .stdout
-                .to_ascii_lowercase()
-                .contains("nothing to commit")
-                || cmd
-                    .stderr
-                    .to_ascii_lowercase()
-                    .contains("nothing to commit") =>
+        Ok(output)
+            if mentions_nothing_to_commit(&output.stdout)
+                || mentions_nothing_to_commit(&output.stderr) =>
         {
             Printer::detail("No changes to commit");
         }
@@ -881,6 +883,14 @@ fn commit_flake_lock(ctx: &AppContext, flake_changes: &[InputChange]) {
     }
 }
 
+/// Case-insensitive search on raw git output, so no stream is ever decoded.
+pub(super) fn mentions_nothing_to_commit(output: &[u8]) -> bool {
+    const NEEDLE: &[u8] = b"nothing to commit";
+    output
+        .windows(NEEDLE.len())
+        .any(|window| window.eq_ignore_ascii_case(NEEDLE))
+}
+
 fn build_upgrade_commit_message(flake_changes: &[InputChange]) -> String {
     if flake_changes.is_empty() {
         return "Update flake inputs".to_string();
@@ -888,12 +898,12 @@ fn build_upgrade_commit_message(flake_changes: &[InputChange]) -> String {
 
     let mut names = flake_changes
         .iter()
-        .map(|change| change.name.as_str())
         .take(5)
-        .map(str::to_string)
-        .collect::<Vec<_>>();
+        .map(|change| change.name.as_str())
+        .collect::<Vec<_>>()
+        .join(", ");
     if flake_changes.len() > 5 {
-        names.push(format!("+{} more", flake_changes.len() - 5));
+        names.push_str(&format!(", +{} more", flake_changes.len() - 5));
     }
-    format!("Update flake ({})", names.join(", "))
+    format!("Update flake ({names})")
 }
@@ -133,14 +133,35 @@ impl ConfigFiles {
     }
 }
 
+/// Marker that opens a purpose tag on the first line of a config file.
+const NX_TAG: &[u8] = b"# nx:";
+
+/// Bytes read up front when checking a file for a purpose tag.
+const NX_TAG_PEEK: usize = 256;
+
 /// Read the `# nx:` purpose comment from the first line of a file.
+///
+/// Discovery opens every `.nix` file under the config directories, and most
+/// carry no tag. So the first read is a small buffer that usually settles it.
+/// Only a first line that may still be a tag is read to its end.
 fn read_nx_comment(path: &Path) -> Option<String> {
-    let file = File::open(path).ok()?;
-    let mut reader = BufReader::new(file);
-    let mut first_line = String::new();
-    reader.read_line(&mut first_line).ok()?;
-    let trimmed = first_line.trim();
-    trimmed
+    let mut reader = BufReader::with_capacity(NX_TAG_PEEK, File::open(path).ok()?);
+    let head = reader.fill_buf().ok()?;
+    let first = head.split(|&byte| byte == b'\n').next().unwrap_or_default();
+    let start = first.trim_ascii_start();
+    // A leading ASCII character that is not whitespace is where the trimmed
+    // line starts, so the marker must match from there.
+    if start.first().is_some_and(u8::is_ascii)
+        && !NX_TAG.starts_with(&start[..start.len().min(NX_TAG.len())])
+    {
+        return None;
+    }
+
+    let mut first_line = Vec::new();
+    reader.read_until(b'\n', &mut first_line).ok()?;
+    let first_line = String::from_utf8(first_line).ok()?;
+    first_line
+        .trim()
         .strip_prefix("# nx:")
         .map(|rest| rest.trim().to_string())
 }
@@ -288,6 +309,16 @@ mod tests {
         assert_eq!(read_nx_comment(&path), None);
     }
 
+    #[test]
+    fn read_nx_comment_reads_tag_lines_longer_than_the_peek() {
+        let tmp = TempDir::new().unwrap();
+        let path = tmp.path().join("test.nix");
+        let purpose = "x".repeat(NX_TAG_PEEK * 2);
+        fs::write(&path, format!("  # nx: {purpose}  \n{{}}")).unwrap();
+
+        assert_eq!(read_nx_comment(&path), Some(purpose));
+    }
+
     #[test]
     fn keyword_match_is_case_insensitive() {
         let tmp = TempDir::new().unwrap();
@@ -1,8 +1,9 @@
+use std::borrow::Cow;
+use std::cell::OnceCell;
 use std::collections::HashMap;
 use std::fmt;
 use std::sync::LazyLock;
 
-use regex::Regex;
 use serde_json::Value;
 
 // --- Types
@@ -39,15 +40,19 @@ impl PackageSource {
 
     /// Parse from user-facing or serialized string (case-insensitive).
     pub fn parse(s: &str) -> Option<Self> {
-        match s.to_ascii_lowercase().as_str() {
-            "nxs" => Some(Self::Nxs),
-            "nur" => Some(Self::Nur),
-            "flake-input" => Some(Self::FlakeInput),
-            "homebrew" | "brew" => Some(Self::Homebrew),
-            "cask" => Some(Self::Cask),
-            "mas" => Some(Self::Mas),
-            _ => None,
-        }
+        const ALIASES: &[(&str, PackageSource)] = &[
+            ("nxs", PackageSource::Nxs),
+            ("nur", PackageSource::Nur),
+            ("flake-input", PackageSource::FlakeInput),
+            ("homebrew", PackageSource::Homebrew),
+            ("brew", PackageSource::Homebrew),
+            ("cask", PackageSource::Cask),
+            ("mas", PackageSource::Mas),
+        ];
+        ALIASES
+            .iter()
+            .find(|(alias, _)| alias.eq_ignore_ascii_case(s))
+            .map(|&(_, source)| source)
     }
 
     /// Whether this source requires a resolved nix attribute.
@@ -155,23 +160,27 @@ static NAME_MAPPINGS: LazyLock<HashMap<&'static str, &'static str>> = LazyLock::
     ])
 });
 
-/// Language package prefixes that need `withPackages` treatment.
-/// Maps attr prefix -> (runtime, method).
-pub const LANG_PACKAGE_PREFIXES: &[(&str, &str, &str)] = &[
-    ("python3Packages.", "python3", "withPackages"),
-    ("python311Packages.", "python3", "withPackages"),
-    ("python312Packages.", "python3", "withPackages"),
-    ("python313Packages.", "python3", "withPackages"),
-    ("python314Packages.", "python3", "withPackages"),
-    ("luaPackages.", "lua5_4", "withPackages"),
-    ("lua51Packages.", "lua5_1", "withPackages"),
-    ("lua52Packages.", "lua5_2", "withPackages"),
-    ("lua53Packages.", "lua5_3", "withPackages"),
-    ("lua54Packages.", "lua5_4", "withPackages"),
-    ("perlPackages.", "perl", "withPackages"),
-    ("rubyPackages.", "ruby", "withPackages"),
-    ("haskellPackages.", "haskellPackages.ghc", "withPackages"),
-];
+/// Language package sets that need `withPackages` treatment.
+/// Maps the attr segment before the first dot -> (runtime, method), so a
+/// package name is classified with one lookup.
+static LANG_PACKAGE_SETS: LazyLock<HashMap<&'static str, (&'static str, &'static str)>> =
+    LazyLock::new(|| {
+        HashMap::from([
+            ("python3Packages", ("python3", "withPackages")),
+            ("python311Packages", ("python3", "withPackages")),
+            ("python312Packages", ("python3", "withPackages")),
+            ("python313Packages", ("python3", "withPackages")),
+            ("python314Packages", ("python3", "withPackages")),
+            ("luaPackages", ("lua5_4", "withPackages")),
+            ("lua51Packages", ("lua5_1", "withPackages")),
+            ("lua52Packages", ("lua5_2", "withPackages")),
+            ("lua53Packages", ("lua5_3", "withPackages")),
+            ("lua54Packages", ("lua5_4", "withPackages")),
+            ("perlPackages", ("perl", "withPackages")),
+            ("rubyPackages", ("ruby", "withPackages")),
+            ("haskellPackages", ("haskellPackages.ghc", "withPackages")),
+        ])
+    });
 
 /// Known overlays and the packages they replace/provide.
 /// Maps `package_name` -> `(overlay_name, attr_in_overlay, description)`.
@@ -225,19 +234,28 @@ pub static OVERLAY_PACKAGES: LazyLock<
 
 // --- Pure Functions
 
+/// Key for an alias lookup: the name itself when it is already lowercase
+/// ASCII, as nearly every queried name is, otherwise its lowercase copy.
+fn mapping_key(name: &str) -> Cow<'_, str> {
+    if name.is_ascii() && !name.bytes().any(|byte| byte.is_ascii_uppercase()) {
+        Cow::Borrowed(name)
+    } else {
+        Cow::Owned(name.to_lowercase())
+    }
+}
+
 /// Normalize a package name through alias mapping (case-insensitive).
 pub fn normalize_name(name: &str) -> String {
-    let lower = name.to_lowercase();
+    let key = mapping_key(name);
     NAME_MAPPINGS
-        .get(lower.as_str())
-        .map_or(lower, |mapped| mapped.to_lowercase())
+        .get(key.as_ref())
+        .map_or_else(|| key.into_owned(), |mapped| mapped.to_lowercase())
 }
 
 /// Resolve common aliases case-insensitively (returns mapped or original).
 pub fn mapped_name(name: &str) -> String {
-    let lower = name.to_lowercase();
     NAME_MAPPINGS
-        .get(lower.as_str())
+        .get(mapping_key(name).as_ref())
         .map_or_else(|| name.to_string(), |mapped| (*mapped).to_string())
 }
 
@@ -245,14 +263,12 @@ pub fn mapped_name(name: &str) -> String {
 ///
 /// Returns `(bare_name, runtime, method)` or `None`.
 pub fn detect_language_package(name: &str) -> Option<(&str, &str, &str)> {
-    for &(prefix, runtime, method) in LANG_PACKAGE_PREFIXES {
-        if let Some(bare) = name.strip_prefix(prefix)
-            && !bare.is_empty()
-        {
-            return Some((bare, runtime, method));
-        }
+    let (set, bare) = name.split_once('.')?;
+    if bare.is_empty() {
+        return None;
     }
-    None
+    let &(runtime, method) = LANG_PACKAGE_SETS.get(set)?;
+    Some((bare, runtime, method))
 }
 
 /// Strip the `legacyPackages.<arch>` prefix from a nix attribute path.
@@ -267,12 +283,47 @@ pub fn clean_attr_path(attr: &str) -> &str {
 }
 
 /// Strip non-alphanumeric characters for normalized comparison.
+///
+/// A plain character filter over the lowercased input: the kept set is just
+/// `[a-z0-9]`, so there is nothing for a regex engine to do.
 fn strip_separators(s: &str) -> String {
-    static RE: LazyLock<Regex> = LazyLock::new(|| Regex::new(r"[^a-z0-9]+").unwrap());
-    RE.replace_all(&s.to_lowercase(), "").into_owned()
+    separator_free_chars(s).collect()
 }
 
-// --- Scoring constants for score_match ---
+/// The characters `strip_separators` keeps, without collecting them.
+fn separator_free_chars(s: &str) -> impl Iterator<Item = char> + '_ {
+    s.chars()
+        .flat_map(char::to_lowercase)
+        .filter(|c| c.is_ascii_lowercase() || c.is_ascii_digit())
+}
+
+/// Hashed fingerprint of the characters `strip_separators` keeps and of each
+/// adjacent pair of them, one bit per hash.
+///
+/// When one string's separator-free form contains another's, every bit of the
+/// inner fingerprint is also set in the outer one. Non-ASCII text can
+/// lowercase into ASCII, so it gets a fingerprint that rules nothing out.
+fn char_pair_mask(s: &str) -> u64 {
+    if !s.is_ascii() {
+        return u64::MAX;
+    }
+    let mut mask = 0;
+    let mut prev = None;
+    for byte in s
+        .bytes()
+        .map(|byte| byte.to_ascii_lowercase())
+        .filter(u8::is_ascii_alphanumeric)
+    {
+        mask |= 1 << (byte % 64);
+        if let Some(prev) = prev {
+            mask |= 1 << ((u32::from(prev) * 31 + u32::from(byte)) % 64);
+        }
+        prev = Some(byte);
+    }
+    mask
+}
+
+// --- Scoring constants for MatchScorer ---
 //
 // Hierarchy: exact pname > exact tail > case-insensitive > prefix > substring.
 // Root-level packages score higher than nested ones (e.g. pkgs.redis > pkgs.foo.redis).
@@ -308,132 +359,191 @@ const MAX_NESTING_PENALTY: f64 = 0.3;
 /// Per-level nesting penalty.
 const NESTING_PENALTY_PER_LEVEL: f64 = 0.1;
 
-/// Score how well an attribute matches the search name.
+/// Scores search entries against one query.
 ///
-/// Prefers root-level packages (pkgs.redis) over nested ones
-/// (`pkgs.chickenPackages.eggs.redis`). Returns 0.0-1.0.
-pub fn score_match(search_name: &str, attr: &str, pname: &str) -> f64 {
-    let parts: Vec<&str> = attr.split('.').collect();
-    let tail = parts.last().copied().unwrap_or(attr);
-
-    let is_root = if attr.starts_with("legacyPackages.") {
-        parts.len() == 3
-    } else {
-        parts.len() == 1
-    };
+/// The query's lowercase and separator-free forms are the same for every
+/// entry of a result set, so they are derived once here instead of on each
+/// scored entry.
+pub struct MatchScorer<'a> {
+    name: &'a str,
+    lower: String,
+    norm: String,
+    mask: u64,
+}
 
-    let nesting_penalty = if is_root {
-        0.0
-    } else {
-        let depth = if attr.starts_with("legacyPackages.") {
-            parts.len().saturating_sub(3)
+impl<'a> MatchScorer<'a> {
+    pub fn new(search_name: &'a str) -> Self {
+        let norm = strip_separators(search_name);
+        Self {
+            name: search_name,
+            lower: search_name.to_lowercase(),
+            mask: char_pair_mask(&norm),
+            norm,
+        }
+    }
+
+    /// Score how well an attribute matches the search name.
+    ///
+    /// Prefers root-level packages (pkgs.redis) over nested ones
+    /// (`pkgs.chickenPackages.eggs.redis`). Returns 0.0-1.0.
+    ///
+    /// Runs once per search entry, so the attribute path is walked once,
+    /// from the end, for both its tail and its depth, without collecting its
+    /// segments. The pname is compared against the normalized query without
+    /// building its normalized copy.
+    pub fn score(&self, attr: &str, pname: &str) -> f64 {
+        let mut rev_segments = attr.rsplit('.');
+        let tail = rev_segments.next().unwrap_or(attr);
+        let segments = 1 + rev_segments.count();
+
+        let root_segments = if attr.starts_with("legacyPackages.") {
+            3
         } else {
-            parts.len().saturating_sub(1)
-        };
-        let depth_penalty = match u32::try_from(depth) {
-            Ok(depth) => f64::from(depth) * NESTING_PENALTY_PER_LEVEL,
-            Err(_) => MAX_NESTING_PENALTY,
+            1
         };
-        f64::min(MAX_NESTING_PENALTY, depth_penalty)
-    };
-
-    let search_lower = search_name.to_lowercase();
-    let tail_lower = tail.to_lowercase();
-    let search_norm = strip_separators(search_name);
-    let tail_norm = strip_separators(tail);
-    let pname_norm = strip_separators(pname);
+        let is_root = segments == root_segments;
 
-    // Exact matches (highest priority, checked first)
-    let exact_score: f64 = if pname == search_name {
-        if is_root {
-            SCORE_EXACT_ROOT_PNAME
+        let nesting_penalty = if is_root {
+            0.0
         } else {
-            SCORE_EXACT_NESTED_PNAME
-        }
-    } else if tail == search_name {
-        if is_root {
-            SCORE_EXACT_ROOT_TAIL
-        } else {
-            SCORE_TAIL_CASE_INSENSITIVE
+            let depth = segments.saturating_sub(root_segments);
+            let depth_penalty = match u32::try_from(depth) {
+                Ok(depth) => f64::from(depth) * NESTING_PENALTY_PER_LEVEL,
+                Err(_) => MAX_NESTING_PENALTY,
+            };
+            f64::min(MAX_NESTING_PENALTY, depth_penalty)
+        };
+
+        // Every tail rule below needs the normalized query inside the
+        // normalized tail. Most entries of a search miss part of the query's
+        // fingerprint, and those can only score through their pname.
+        if !self.norm.is_empty() && self.mask & !char_pair_mask(tail) != 0 {
+            let pname_score = if separator_free_chars(pname).eq(self.norm.chars()) {
+                if is_root {
+                    SCORE_EXACT_ROOT_PNAME
+                } else {
+                    SCORE_EXACT_NESTED_PNAME
+                }
+            } else {
+                SCORE_FLOOR
+            };
+            return pname_score - nesting_penalty;
         }
-    } else if tail_lower == search_lower {
-        SCORE_CASE_INSENSITIVE
-    } else if tail.starts_with(search_name) {
-        SCORE_PREFIX
-    } else if tail_lower.starts_with(&search_lower) {
-        SCORE_PREFIX_CI
-    } else if tail_lower.contains(&search_lower) {
-        SCORE_SUBSTRING_CI
-    } else {
-        SCORE_FLOOR
-    };
 
-    // Separator-normalized comparison (e.g. py-yaml vs pyyaml)
-    let norm_score = if search_norm.is_empty() {
-        0.0
-    } else if pname_norm == search_norm {
-        if is_root {
-            SCORE_EXACT_ROOT_PNAME
+        let tail_lower = tail.to_lowercase();
+
+        // Exact matches (highest priority, checked first)
+        let exact_score: f64 = if pname == self.name {
+            if is_root {
+                SCORE_EXACT_ROOT_PNAME
+            } else {
+                SCORE_EXACT_NESTED_PNAME
+            }
+        } else if tail == self.name {
+            if is_root {
+                SCORE_EXACT_ROOT_TAIL
+            } else {
+                SCORE_TAIL_CASE_INSENSITIVE
+            }
+        } else if tail_lower == self.lower {
+            SCORE_CASE_INSENSITIVE
+        } else if tail.starts_with(self.name) {
+            SCORE_PREFIX
+        } else if tail_lower.starts_with(&self.lower) {
+            SCORE_PREFIX_CI
+        } else if tail_lower.contains(&self.lower) {
+            SCORE_SUBSTRING_CI
         } else {
-            SCORE_EXACT_NESTED_PNAME
-        }
-    } else if tail_norm == search_norm {
-        if is_root {
-            SCORE_NORM_ROOT_TAIL
+            SCORE_FLOOR
+        };
+
+        // Separator-normalized comparison (e.g. py-yaml vs pyyaml). The rules
+        // are listed best score first, so only those that could still beat
+        // the exact score are tried, and the normalized tail is built only
+        // when one of them needs it. It is filtered out of the lowercase tail
+        // above, so the characters are not lowercased a second time.
+        let tail_norm_cell = OnceCell::new();
+        let tail_norm = || {
+            tail_norm_cell
+                .get_or_init(|| {
+                    tail_lower
+                        .chars()
+                        .filter(|c| c.is_ascii_lowercase() || c.is_ascii_digit())
+                        .collect::<String>()
+                })
+                .as_str()
+        };
+        let norm_rules: [(f64, &dyn Fn() -> bool); 4] = [
+            (
+                if is_root {
+                    SCORE_EXACT_ROOT_PNAME
+                } else {
+                    SCORE_EXACT_NESTED_PNAME
+                },
+                &|| separator_free_chars(pname).eq(self.norm.chars()),
+            ),
+            (
+                if is_root {
+                    SCORE_NORM_ROOT_TAIL
+                } else {
+                    SCORE_EXACT_NESTED_TAIL
+                },
+                &|| tail_norm() == self.norm,
+            ),
+            (SCORE_NORM_PREFIX, &|| tail_norm().starts_with(&self.norm)),
+            (SCORE_NORM_SUBSTRING, &|| tail_norm().contains(&self.norm)),
+        ];
+        let norm_score = if self.norm.is_empty() {
+            0.0
         } else {
-            SCORE_EXACT_NESTED_TAIL
-        }
-    } else if tail_norm.starts_with(&search_norm) {
-        SCORE_NORM_PREFIX
-    } else if tail_norm.contains(&search_norm) {
-        SCORE_NORM_SUBSTRING
-    } else {
-        0.0
-    };
+            norm_rules
+                .iter()
+                .take_while(|(score, _)| *score > exact_score)
+                .find(|(_, hit)| hit())
+                .map_or(0.0, |(score, _)| *score)
+        };
 
-    exact_score.max(norm_score) - nesting_penalty
+        exact_score.max(norm_score) - nesting_penalty
+    }
 }
 
-/// Extract a `NixSearchEntry` from a JSON object map.
-fn entry_from_obj(obj: &serde_json::Map<String, Value>, fallback_attr: &str) -> NixSearchEntry {
-    let str_field = |key| {
-        obj.get(key)
-            .and_then(Value::as_str)
-            .unwrap_or("")
-            .to_string()
+/// Extract a `NixSearchEntry` from a JSON object map, moving its strings out.
+fn entry_from_obj(
+    mut obj: serde_json::Map<String, Value>,
+    fallback_attr: String,
+) -> NixSearchEntry {
+    let mut take_str = |key| match obj.remove(key) {
+        Some(Value::String(text)) => Some(text),
+        _ => None,
     };
     NixSearchEntry {
-        attr_path: obj
-            .get("attrPath")
-            .and_then(Value::as_str)
-            .unwrap_or(fallback_attr)
-            .to_string(),
-        pname: str_field("pname"),
-        version: str_field("version"),
-        description: str_field("description"),
+        attr_path: take_str("attrPath").unwrap_or(fallback_attr),
+        pname: take_str("pname").unwrap_or_default(),
+        version: take_str("version").unwrap_or_default(),
+        description: take_str("description").unwrap_or_default(),
     }
 }
 
 /// Parse nix search JSON output into typed entries.
 ///
 /// Handles both dict format (`attrPath -> {pname, description, ...}`)
-/// and list format.
-pub fn parse_nix_search_results(data: &Value) -> Vec<NixSearchEntry> {
+/// and list format. The parsed output is consumed so keys and field strings
+/// move into the entries instead of being copied.
+pub fn parse_nix_search_results(data: Value) -> Vec<NixSearchEntry> {
     match data {
         Value::Object(map) => map
-            .iter()
-            .map(|(key, val)| {
-                let obj = val.as_object();
-                obj.map_or_else(
-                    || entry_from_obj(&serde_json::Map::new(), key),
-                    |o| entry_from_obj(o, key),
-                )
+            .into_iter()
+            .map(|(key, val)| match val {
+                Value::Object(obj) => entry_from_obj(obj, key),
+                _ => entry_from_obj(serde_json::Map::new(), key),
             })
             .collect(),
         Value::Array(arr) => arr
-            .iter()
-            .filter_map(Value::as_object)
-            .map(|obj| entry_from_obj(obj, ""))
+            .into_iter()
+            .filter_map(|val| match val {
+                Value::Object(obj) => Some(entry_from_obj(obj, String::new())),
+                _ => None,
+            })
             .collect(),
         _ => Vec::new(),
     }
@@ -560,6 +670,10 @@ mod tests {
     use super::*;
     use serde_json::json;
 
+    fn score_match(search_name: &str, attr: &str, pname: &str) -> f64 {
+        MatchScorer::new(search_name).score(attr, pname)
+    }
+
     // --- normalize_name ---
 
     #[test]
@@ -567,6 +681,10 @@ mod tests {
         assert_eq!(normalize_name("py-yaml"), "pyyaml");
         assert_eq!(normalize_name("py_yaml"), "pyyaml");
         assert_eq!(normalize_name("nvim"), "neovim");
+        assert_eq!(normalize_name("NVim"), "neovim");
+        assert_eq!(normalize_name("RipGrep"), "ripgrep");
+        assert_eq!(mapped_name("PY-YAML"), "pyyaml");
+        assert_eq!(mapped_name("RipGrep"), "RipGrep");
         assert_eq!(normalize_name("python"), "python3");
         assert_eq!(normalize_name("rg"), "ripgrep");
         assert_eq!(normalize_name("1password"), "_1password-gui");
@@ -635,6 +753,41 @@ mod tests {
         );
     }
 
+    #[test]
+    fn strip_separators_keeps_lowercased_ascii_alphanumerics() {
+        assert_eq!(strip_separators("Py-YAML_2.0"), "pyyaml20");
+        assert_eq!(strip_separators("Über-tool"), "bertool");
+        assert_eq!(strip_separators("--"), "");
+    }
+
+    #[test]
+    fn score_match_takes_best_of_exact_and_normalized_rules() {
+        let prefix = score_match("ripgrep", "ripgrep-all", "ripgrep-all");
+        assert!((prefix - SCORE_NORM_PREFIX).abs() < f64::EPSILON);
+
+        let exact = score_match("redis", "legacyPackages.aarch64-darwin.redis", "redis");
+        assert!((exact - SCORE_EXACT_ROOT_PNAME).abs() < f64::EPSILON);
+
+        let no_norm = score_match("--", "legacyPackages.aarch64-darwin.redis", "redis");
+        assert!((no_norm - SCORE_FLOOR).abs() < f64::EPSILON);
+    }
+
+    #[test]
+    fn score_match_rejects_unrelated_tails_but_keeps_pname_matches() {
+        let unrelated = score_match("ripgrep", "legacyPackages.x86_64-linux.foo.bat", "bat");
+        assert!((unrelated - (SCORE_FLOOR - NESTING_PENALTY_PER_LEVEL)).abs() < 1e-9);
+
+        let renamed = score_match("ripgrep", "legacyPackages.x86_64-linux.rg", "ripgrep");
+        assert!((renamed - SCORE_EXACT_ROOT_PNAME).abs() < f64::EPSILON);
+
+        assert_eq!(
+            char_pair_mask("Über") & char_pair_mask("x"),
+            char_pair_mask("x")
+        );
+        let outer = char_pair_mask("python3-yaml");
+        assert_eq!(char_pair_mask("on3y") & !outer, 0);
+    }
+
     #[test]
     fn score_match_exact_bare() {
         let s = score_match("ripgrep", "ripgrep", "ripgrep");
@@ -685,7 +838,7 @@ mod tests {
                 "description": "fast grep"
             }
         });
-        let entries = parse_nix_search_results(&data);
+        let entries = parse_nix_search_results(data);
         assert_eq!(entries.len(), 1);
         assert_eq!(entries[0].pname, "ripgrep");
         assert_eq!(entries[0].version, "14.1.0");
@@ -693,7 +846,7 @@ mod tests {
 
     #[test]
     fn parse_empty_input() {
-        let entries = parse_nix_search_results(&json!({}));
+        let entries = parse_nix_search_results(json!({}));
         assert!(entries.is_empty());
     }
 
@@ -706,10 +859,23 @@ mod tests {
                 "description": "find alternative"
             }
         });
-        let entries = parse_nix_search_results(&data);
+        let entries = parse_nix_search_results(data);
         assert_eq!(entries[0].attr_path, "legacyPackages.x86_64-linux.fd");
     }
 
+    #[test]
+    fn parse_prefers_explicit_attr_path_and_skips_non_objects_in_lists() {
+        let data = json!([
+            {"attrPath": "legacyPackages.x86_64-linux.bat", "pname": "bat", "version": 1},
+            "not an entry"
+        ]);
+        let entries = parse_nix_search_results(data);
+        assert_eq!(entries.len(), 1);
+        assert_eq!(entries[0].attr_path, "legacyPackages.x86_64-linux.bat");
+        assert_eq!(entries[0].pname, "bat");
+        assert_eq!(entries[0].version, "");
+    }
+
     // --- detect_language_package ---
 
     #[test]
@@ -729,6 +895,17 @@ mod tests {
         assert!(detect_language_package("ripgrep").is_none());
     }
 
+    #[test]
+    fn detect_requires_set_name_and_bare_name() {
+        assert!(detect_language_package("python3Packages.").is_none());
+        assert!(detect_language_package("python3Packages").is_none());
+        assert!(detect_language_package("xpython3Packages.rich").is_none());
+        assert_eq!(
+            detect_language_package("haskellPackages.lens.doc"),
+            Some(("lens.doc", "haskellPackages.ghc", "withPackages"))
+        );
+    }
+
     #[test]
     fn detect_versioned_python() {
         let result = detect_language_package("python312Packages.requests");
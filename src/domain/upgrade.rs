@@ -1,6 +1,7 @@
 use std::collections::HashMap;
 use std::fs;
 use std::path::Path;
+use std::sync::LazyLock;
 
 use anyhow::Context;
 use regex::Regex;
@@ -53,6 +54,9 @@ pub fn load_flake_lock(repo_root: &Path) -> anyhow::Result<HashMap<String, Flake
 /// Skips `file` type inputs (binary artifacts, no changelog).
 /// Skips `follows` references (list-valued inputs).
 pub fn parse_flake_lock(path: &Path) -> anyhow::Result<HashMap<String, FlakeLockInput>> {
+    static FLAKEHUB_RE: LazyLock<Regex> =
+        LazyLock::new(|| Regex::new(r"/f/pinned/([^/]+)/([^/]+)/").expect("valid regex"));
+
     let content =
         fs::read_to_string(path).with_context(|| format!("reading {}", path.display()))?;
     let lock_data: Value =
@@ -72,7 +76,6 @@ pub fn parse_flake_lock(path: &Path) -> anyhow::Result<HashMap<String, FlakeLock
         return Ok(HashMap::new());
     };
 
-    let flakehub_re = Regex::new(r"/f/pinned/([^/]+)/([^/]+)/").expect("valid regex");
     let mut inputs = HashMap::new();
 
     for (input_name, node_ref) in root_inputs {
@@ -109,7 +112,7 @@ pub fn parse_flake_lock(path: &Path) -> anyhow::Result<HashMap<String, FlakeLock
                 .get("url")
                 .and_then(Value::as_str)
                 .unwrap_or_default();
-            flakehub_re.captures(url).map_or((None, None), |caps| {
+            FLAKEHUB_RE.captures(url).map_or((None, None), |caps| {
                 (Some(caps[1].to_string()), Some(caps[2].to_string()))
             })
         } else {
@@ -137,22 +140,17 @@ pub fn diff_locks(
     new: &HashMap<String, FlakeLockInput>,
 ) -> LockDiff {
     let mut changed = Vec::new();
-    let mut added: Vec<String> = new
-        .keys()
-        .filter(|k| !old.contains_key(k.as_str()))
-        .cloned()
-        .collect();
+    let mut added = Vec::new();
     let mut removed: Vec<String> = old
         .keys()
         .filter(|k| !new.contains_key(k.as_str()))
         .cloned()
         .collect();
 
-    added.sort();
-    removed.sort();
-
+    // One lookup per new input classifies it as added, unchanged, or changed.
     for (name, new_input) in new {
         let Some(old_input) = old.get(name) else {
+            added.push(name.clone());
             continue;
         };
 
@@ -172,6 +170,8 @@ pub fn diff_locks(
         }
     }
 
+    added.sort();
+    removed.sort();
     changed.sort_by(|a, b| a.name.cmp(&b.name));
 
     LockDiff {
@@ -1,4 +1,6 @@
+use std::collections::HashSet;
 use std::path::Path;
+use std::sync::LazyLock;
 
 use regex::Regex;
 
@@ -259,7 +261,9 @@ pub fn build_routing_context(config: &ConfigFiles) -> String {
         .to_string_lossy()
         .to_string();
 
+    let mut tagged = HashSet::new();
     for (purpose, path) in config.by_purpose() {
+        tagged.insert(path.as_path());
         let rel = path
             .strip_prefix(repo_root)
             .unwrap_or(path)
@@ -267,16 +271,18 @@ pub fn build_routing_context(config: &ConfigFiles) -> String {
         lines.push(format!("- {rel} \u{2192} {purpose}"));
     }
 
-    // Include untagged files
+    // Include untagged files. Tagged ones are recognized by path rather than
+    // by searching the rendered lines, which also matched any tagged file
+    // whose relative path merely ends with this one.
     for path in config.all_files() {
+        if tagged.contains(path.as_path()) {
+            continue;
+        }
         let rel = path
             .strip_prefix(repo_root)
             .unwrap_or(path)
-            .to_string_lossy()
-            .to_string();
-        if !lines.iter().any(|l| l.contains(&rel)) {
-            lines.push(format!("- {rel}"));
-        }
+            .to_string_lossy();
+        lines.push(format!("- {rel}"));
     }
 
     lines.push(String::new());
@@ -330,8 +336,9 @@ fn normalize_path_token(token: &str) -> String {
 
 /// Extract file path tokens (things ending in `.nix`) from AI output text.
 pub fn extract_path_tokens(text: &str) -> Vec<String> {
-    let re = Regex::new(r"[A-Za-z0-9_./-]+\.nix").expect("valid regex");
-    re.find_iter(text)
+    static RE: LazyLock<Regex> =
+        LazyLock::new(|| Regex::new(r"[A-Za-z0-9_./-]+\.nix").expect("valid regex"));
+    RE.find_iter(text)
         .map(|m| normalize_path_token(m.as_str()))
         .filter(|t| !t.is_empty())
         .collect()
@@ -787,6 +794,20 @@ mod tests {
         assert!(context.contains("cli tools and utilities"));
     }
 
+    #[test]
+    fn routing_context_lists_untagged_file_sharing_a_tagged_path_suffix() {
+        let tmp = TempDir::new().unwrap();
+        let root = tmp.path();
+        write_nix(root, "packages/home/foo.nix", "# nx: home helpers\n[]");
+        write_nix(root, "home/foo.nix", "{ ... }: {}");
+
+        let context = build_routing_context(&ConfigFiles::discover(root));
+        let lines = context.lines().collect::<Vec<_>>();
+        assert!(lines.contains(&"- packages/home/foo.nix \u{2192} home helpers"));
+        assert!(lines.contains(&"- home/foo.nix"));
+        assert!(!lines.contains(&"- packages/home/foo.nix"));
+    }
+
     #[test]
     fn routing_context_contains_routing_rules() {
         let (_tmp, config) = test_config();
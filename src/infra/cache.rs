@@ -1,11 +1,15 @@
 use std::collections::HashMap;
 use std::fs;
+use std::io;
 use std::path::{Path, PathBuf};
+use std::time::Duration;
 
 use anyhow::Context;
+use serde::{Deserialize, Serialize};
 use serde_json::Value;
 
 use crate::domain::source::{PackageSource, SourceResult, normalize_name};
+use crate::infra::shell::run_json_command_quiet;
 
 // Shared cache primitives used by query/install flows and cache unit coverage.
 const CACHE_SCHEMA_VERSION: u64 = 1;
@@ -36,6 +40,8 @@ pub struct MultiSourceCache {
     cache_path: PathBuf,
     revisions: HashMap<String, String>,
     entries: HashMap<String, Value>,
+    /// Entries changed since the last write.
+    dirty: bool,
 }
 
 impl MultiSourceCache {
@@ -60,6 +66,7 @@ impl MultiSourceCache {
             cache_path,
             revisions,
             entries,
+            dirty: false,
         })
     }
 
@@ -128,6 +135,13 @@ impl MultiSourceCache {
     ///
     /// Single disk write at the end.
     pub fn set_many(&mut self, results: &[SourceResult]) -> anyhow::Result<()> {
+        self.stage_many(results);
+        self.flush()
+    }
+
+    /// Like [`Self::set_many`], but only in memory; the next [`Self::flush`]
+    /// writes everything staged so far in one go.
+    pub fn stage_many(&mut self, results: &[SourceResult]) {
         let mut best: HashMap<(&str, &str), &SourceResult> = HashMap::new();
         for result in results {
             let key = (result.name.as_str(), result.source.as_str());
@@ -145,9 +159,18 @@ impl MultiSourceCache {
             }
             let key = self.cache_key(&result.name, result.source);
             self.entries.insert(key, entry_to_value(result));
+            self.dirty = true;
         }
+    }
 
-        self.save()
+    /// Write staged entries to disk, if there are any.
+    pub fn flush(&mut self) -> anyhow::Result<()> {
+        if !self.dirty {
+            return Ok(());
+        }
+        self.save()?;
+        self.dirty = false;
+        Ok(())
     }
     // -- Internal --
 
@@ -257,9 +280,129 @@ fn dirs_cache() -> PathBuf {
     crate::app::dirs_home().join(".cache")
 }
 
+// --- Command Results
+
+/// Directory under the nx cache holding one file per cached command.
+const COMMAND_CACHE_DIR: &str = "sources";
+const COMMAND_CACHE_SCHEMA_VERSION: u64 = 1;
+
+/// Freshness of `nix search` and `brew info` answers, which move with
+/// channel and tap updates.
+pub const SEARCH_TTL: Duration = Duration::from_secs(60 * 60);
+/// Freshness of `nix eval` answers about a package's own fields.
+pub const EVAL_TTL: Duration = Duration::from_secs(24 * 60 * 60);
+
+#[derive(Serialize, Deserialize)]
+struct CachedCommand {
+    schema_version: u64,
+    command: Vec<String>,
+    data: Value,
+}
+
+/// Run a JSON-producing command, reusing the output the same command stored
+/// on disk within `ttl`.
+///
+/// Only successes are stored, so a missing attribute or a network failure is
+/// retried on the next run. Cache I/O problems fall back to running the command.
+pub fn cached_json_command(program: &str, args: &[&str], ttl: Duration) -> Option<Value> {
+    match command_cache_dir() {
+        Some(dir) => cached_json_command_in(&dir, program, args, ttl, run_json_command_quiet),
+        None => run_json_command_quiet(program, args),
+    }
+}
+
+/// Remove cached package lookups: the multi-source cache and stored command
+/// results. Caches that do not exist are not an error.
+pub fn clear_lookup_caches() -> anyhow::Result<()> {
+    clear_lookup_caches_in(&dirs_cache().join("nx"))
+}
+
+fn clear_lookup_caches_in(cache_dir: &Path) -> anyhow::Result<()> {
+    let packages = cache_dir.join(CACHE_FILENAME);
+    let commands = cache_dir.join(COMMAND_CACHE_DIR);
+    for (path, removed) in [
+        (&packages, fs::remove_file(&packages)),
+        (&commands, fs::remove_dir_all(&commands)),
+    ] {
+        if let Err(err) = removed
+            && err.kind() != io::ErrorKind::NotFound
+        {
+            return Err(err).with_context(|| format!("removing {}", path.display()));
+        }
+    }
+    Ok(())
+}
+
+fn command_cache_dir() -> Option<PathBuf> {
+    // Unit tests must never be answered from, or write to, the real cache.
+    if cfg!(test) {
+        return None;
+    }
+    Some(dirs_cache().join("nx").join(COMMAND_CACHE_DIR))
+}
+
+fn cached_json_command_in(
+    cache_dir: &Path,
+    program: &str,
+    args: &[&str],
+    ttl: Duration,
+    run: impl FnOnce(&str, &[&str]) -> Option<Value>,
+) -> Option<Value> {
+    let command: Vec<String> = std::iter::once(program)
+        .chain(args.iter().copied())
+        .map(str::to_string)
+        .collect();
+    let path = cache_dir.join(command_file_name(&command));
+    if let Some(data) = load_command_result(&path, &command, ttl) {
+        return Some(data);
+    }
+
+    let entry = CachedCommand {
+        schema_version: COMMAND_CACHE_SCHEMA_VERSION,
+        command,
+        data: run(program, args)?,
+    };
+    // Best effort: a failed write only costs a rerun next time.
+    let _ = save_command_result(&path, &entry);
+    Some(entry.data)
+}
+
+/// The stored file's mtime is its age, so entries carry no timestamp.
+fn load_command_result(path: &Path, command: &[String], ttl: Duration) -> Option<Value> {
+    let age = fs::metadata(path).ok()?.modified().ok()?.elapsed().ok()?;
+    if age >= ttl {
+        return None;
+    }
+    let entry = serde_json::from_slice::<CachedCommand>(&fs::read(path).ok()?).ok()?;
+    (entry.schema_version == COMMAND_CACHE_SCHEMA_VERSION && entry.command == command)
+        .then_some(entry.data)
+}
+
+/// Written to a temp file and renamed so a concurrent reader never sees a
+/// partial entry.
+fn save_command_result(path: &Path, entry: &CachedCommand) -> io::Result<()> {
+    if let Some(parent) = path.parent() {
+        fs::create_dir_all(parent)?;
+    }
+    let tmp = path.with_extension(format!("{}.tmp", std::process::id()));
+    fs::write(&tmp, serde_json::to_vec(entry)?)?;
+    fs::rename(&tmp, path)
+}
+
+/// FNV-1a over the command words. Unlike `DefaultHasher` it is stable across
+/// toolchains; collisions are caught by comparing the stored command.
+fn command_file_name(command: &[String]) -> String {
+    let mut hash: u64 = 0xcbf2_9ce4_8422_2325;
+    for byte in command.iter().flat_map(|word| word.bytes().chain([0])) {
+        hash = (hash ^ u64::from(byte)).wrapping_mul(0x0000_0100_0000_01b3);
+    }
+    format!("{hash:016x}.json")
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
+    use std::cell::Cell;
     use tempfile::TempDir;
 
     fn write_flake_lock(repo: &Path) {
@@ -463,6 +606,32 @@ mod tests {
         assert!(cache.get("ripgrep", PackageSource::Nxs).is_none());
     }
 
+    #[test]
+    fn staged_entries_reach_disk_only_on_flush() {
+        let tmp = TempDir::new().unwrap();
+        let repo = tmp.path().join("repo");
+        fs::create_dir_all(&repo).unwrap();
+        write_flake_lock(&repo);
+
+        let home = tmp.path().join("home");
+        fs::create_dir_all(&home).unwrap();
+
+        let mut cache = make_cache(&repo, &home);
+        cache.stage_many(&[result("ripgrep", PackageSource::Nxs, "ripgrep", 0.9)]);
+        cache.stage_many(&[result("fd", PackageSource::Nxs, "fd", 0.9)]);
+        assert!(cache.get("fd", PackageSource::Nxs).is_some());
+        assert!(
+            make_cache(&repo, &home)
+                .get("ripgrep", PackageSource::Nxs)
+                .is_none()
+        );
+
+        cache.flush().unwrap();
+        let reloaded = make_cache(&repo, &home);
+        assert!(reloaded.get("ripgrep", PackageSource::Nxs).is_some());
+        assert!(reloaded.get("fd", PackageSource::Nxs).is_some());
+    }
+
     #[test]
     fn set_many_surfaces_write_error() {
         let tmp = TempDir::new().unwrap();
@@ -517,6 +686,73 @@ mod tests {
         assert_eq!(r.attr.as_deref(), Some("ripgrep"));
     }
 
+    #[test]
+    fn cached_json_command_reuses_fresh_result_of_same_command() {
+        let tmp = TempDir::new().unwrap();
+        let runs = Cell::new(0);
+        let run = |_: &str, args: &[&str]| {
+            runs.set(runs.get() + 1);
+            Some(serde_json::json!({ "args": args }))
+        };
+
+        let first = cached_json_command_in(tmp.path(), "nix", &["eval", "a"], EVAL_TTL, run);
+        let second = cached_json_command_in(tmp.path(), "nix", &["eval", "a"], EVAL_TTL, run);
+        assert_eq!(runs.get(), 1);
+        assert_eq!(first, second);
+
+        cached_json_command_in(tmp.path(), "nix", &["eval", "b"], EVAL_TTL, run);
+        assert_eq!(runs.get(), 2);
+
+        // An expired entry is rerun, as is one whose stored command differs.
+        cached_json_command_in(tmp.path(), "nix", &["eval", "a"], Duration::ZERO, run);
+        assert_eq!(runs.get(), 3);
+        let command = ["nix", "eval", "a"].map(String::from);
+        let collided = CachedCommand {
+            schema_version: COMMAND_CACHE_SCHEMA_VERSION,
+            command: vec!["brew".to_string()],
+            data: Value::Null,
+        };
+        save_command_result(&tmp.path().join(command_file_name(&command)), &collided).unwrap();
+        cached_json_command_in(tmp.path(), "nix", &["eval", "a"], EVAL_TTL, run);
+        assert_eq!(runs.get(), 4);
+    }
+
+    #[test]
+    fn cached_json_command_does_not_store_failures() {
+        let tmp = TempDir::new().unwrap();
+        assert!(
+            cached_json_command_in(tmp.path(), "nix", &["eval"], EVAL_TTL, |_, _| None).is_none()
+        );
+
+        let value = cached_json_command_in(tmp.path(), "nix", &["eval"], EVAL_TTL, |_, _| {
+            Some(Value::Bool(true))
+        });
+        assert_eq!(value, Some(Value::Bool(true)));
+    }
+
+    #[test]
+    fn clear_lookup_caches_removes_package_and_command_caches() {
+        let tmp = TempDir::new().unwrap();
+        let cache_dir = tmp.path().join("nx");
+        clear_lookup_caches_in(&cache_dir).expect("clearing missing caches should succeed");
+
+        fs::create_dir_all(&cache_dir).unwrap();
+        fs::write(cache_dir.join(CACHE_FILENAME), "{}").unwrap();
+        cached_json_command_in(
+            &cache_dir.join(COMMAND_CACHE_DIR),
+            "nix",
+            &["eval"],
+            EVAL_TTL,
+            |_, _| Some(Value::Null),
+        );
+        fs::write(cache_dir.join("finder_index.json"), "{}").unwrap();
+
+        clear_lookup_caches_in(&cache_dir).expect("caches should be cleared");
+        assert!(!cache_dir.join(CACHE_FILENAME).exists());
+        assert!(!cache_dir.join(COMMAND_CACHE_DIR).exists());
+        assert!(cache_dir.join("finder_index.json").exists());
+    }
+
     #[test]
     fn cask_shares_homebrew_revision() {
         let tmp = TempDir::new().unwrap();
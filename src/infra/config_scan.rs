@@ -24,36 +24,70 @@ pub fn scan_packages(repo_root: &Path) -> anyhow::Result<PackageBuckets> {
     for nix_file in collect_nix_files(repo_root) {
         let content = fs::read_to_string(&nix_file)
             .with_context(|| format!("reading {}", nix_file.display()))?;
-        collect_nixpkgs_packages(&content, &mut out, &mut seen);
-        collect_homebrew_items(
-            &nix_file,
-            &content,
-            "brews.nix",
-            brews_regex(),
-            &mut out.brews,
-            &mut seen.brews,
-        );
-        collect_homebrew_items(
-            &nix_file,
-            &content,
-            "casks.nix",
-            casks_regex(),
-            &mut out.casks,
-            &mut seen.casks,
-        );
-        collect_mas_apps(&content, &mut out, &mut seen);
-        collect_launchd_services(&content, &mut out, &mut seen);
+        scan_file(&nix_file, &content, &mut out, &mut seen);
     }
 
     Ok(out)
 }
 
+/// Scan already-loaded `(path, content)` pairs, in order, without touching disk.
+pub fn scan_package_contents<'a>(
+    files: impl IntoIterator<Item = (&'a Path, &'a str)>,
+) -> PackageBuckets {
+    let mut out = PackageBuckets::default();
+    let mut seen = SourceSeen::default();
+    for (nix_file, content) in files {
+        scan_file(nix_file, content, &mut out, &mut seen);
+    }
+    out
+}
+
+fn scan_file(nix_file: &Path, content: &str, out: &mut PackageBuckets, seen: &mut SourceSeen) {
+    collect_nixpkgs_packages(content, out, seen);
+    collect_homebrew_items(
+        nix_file,
+        content,
+        "brews.nix",
+        brews_regex(),
+        &mut out.brews,
+        &mut seen.brews,
+    );
+    collect_homebrew_items(
+        nix_file,
+        content,
+        "casks.nix",
+        casks_regex(),
+        &mut out.casks,
+        &mut seen.casks,
+    );
+    collect_mas_apps(content, out, seen);
+    collect_launchd_services(content, out, seen);
+}
+
+/// `.nix` files under the scan roots plus metadata for every directory walked.
+pub struct NixTree {
+    pub files: Vec<PathBuf>,
+    /// Captured before each directory's entries are read, so any later add,
+    /// remove, or rename inside it shows up as a newer mtime.
+    pub dirs: Vec<(PathBuf, fs::Metadata)>,
+}
+
 /// Collect `.nix` files for package/service scanning.
 ///
 /// Skips only `common.nix`. Unlike `ConfigFiles::discover`, this intentionally
 /// includes `default.nix` because it may contain launchd service definitions.
 pub fn collect_nix_files(repo_root: &Path) -> Vec<PathBuf> {
-    let mut out = Vec::new();
+    collect_nix_tree(repo_root).files
+}
+
+/// Like `collect_nix_files`, but also records the directories that were walked.
+pub fn collect_nix_tree(repo_root: &Path) -> NixTree {
+    let mut files = Vec::new();
+    let mut dirs = Vec::new();
+    if let Ok(metadata) = fs::metadata(repo_root) {
+        dirs.push((repo_root.to_path_buf(), metadata));
+    }
+
     for dir_name in ["home", "system", "hosts", "packages"] {
         let dir_path = repo_root.join(dir_name);
         if !dir_path.exists() {
@@ -61,10 +95,16 @@ pub fn collect_nix_files(repo_root: &Path) -> Vec<PathBuf> {
         }
 
         for entry in WalkDir::new(&dir_path).into_iter().filter_map(Result::ok) {
+            let path = entry.path();
+            if entry.file_type().is_dir() {
+                if let Ok(metadata) = fs::metadata(path) {
+                    dirs.push((path.to_path_buf(), metadata));
+                }
+                continue;
+            }
             if !entry.file_type().is_file() {
                 continue;
             }
-            let path = entry.path();
             if path.extension().and_then(|ext| ext.to_str()) != Some("nix") {
                 continue;
             }
@@ -75,11 +115,11 @@ pub fn collect_nix_files(repo_root: &Path) -> Vec<PathBuf> {
             if file_name == "common.nix" {
                 continue;
             }
-            out.push(path.to_path_buf());
+            files.push(path.to_path_buf());
         }
     }
-    out.sort();
-    out
+    files.sort();
+    NixTree { files, dirs }
 }
 
 #[derive(Default)]
@@ -1,15 +1,16 @@
 use std::collections::{HashMap, HashSet};
 use std::fs;
 use std::path::{Path, PathBuf};
-use std::sync::{Arc, LazyLock, Mutex};
+use std::sync::{Arc, LazyLock, Mutex, OnceLock};
 use std::time::UNIX_EPOCH;
 
 use anyhow::Context;
-use regex::Regex;
+use regex::bytes::Regex;
+use serde::{Deserialize, Serialize};
 
 use crate::domain::location::PackageLocation;
 use crate::domain::source::normalize_name;
-use crate::infra::config_scan::{collect_nix_files, scan_packages};
+use crate::infra::config_scan::{PackageBuckets, collect_nix_tree, scan_package_contents};
 
 #[derive(Debug, Clone)]
 pub struct PackageMatch {
@@ -17,33 +18,160 @@ pub struct PackageMatch {
     pub location: PackageLocation,
 }
 
-#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+const FINDER_INDEX_SCHEMA_VERSION: u64 = 1;
+const FINDER_INDEX_FILENAME: &str = "finder_index.json";
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Serialize, Deserialize)]
 struct FileSignature {
     mtime_ns: u128,
     size: u64,
 }
 
-#[derive(Debug, Clone, PartialEq, Eq)]
+#[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
 struct FileSnapshot {
     path: PathBuf,
     signature: FileSignature,
 }
 
+/// Raw file bytes held once, with line-start offsets so lines are borrowed slices.
+///
+/// Matching runs on bytes, so files are never UTF-8 validated up front and a
+/// stray non-UTF-8 file cannot fail every lookup.
 #[derive(Debug)]
 struct IndexedFile {
     path: PathBuf,
-    lines: Vec<String>,
+    content: Vec<u8>,
+    line_starts: Vec<usize>,
+}
+
+impl IndexedFile {
+    fn new(path: PathBuf, content: Vec<u8>) -> Self {
+        let line_starts = std::iter::once(0)
+            .chain(
+                content
+                    .iter()
+                    .enumerate()
+                    .filter(|&(_, &byte)| byte == b'\n')
+                    .map(|(idx, _)| idx + 1),
+            )
+            .filter(|&start| start < content.len())
+            .collect();
+        Self {
+            path,
+            content,
+            line_starts,
+        }
+    }
+
+    /// Iterate lines with `str::lines` semantics without re-scanning for newlines.
+    fn lines(&self) -> impl Iterator<Item = &[u8]> {
+        self.line_starts.iter().enumerate().map(|(idx, &start)| {
+            let end = self
+                .line_starts
+                .get(idx + 1)
+                .copied()
+                .unwrap_or(self.content.len());
+            let line = &self.content[start..end];
+            line.strip_suffix(b"\n").map_or(line, |stripped| {
+                stripped.strip_suffix(b"\r").unwrap_or(stripped)
+            })
+        })
+    }
 }
 
 #[derive(Debug)]
 struct FinderIndex {
     snapshots: Vec<FileSnapshot>,
     files: Vec<IndexedFile>,
+    fuzzy: OnceLock<FuzzyCandidates>,
+}
+
+impl FinderIndex {
+    /// Package names scanned from the indexed contents, built on first fuzzy lookup.
+    fn fuzzy_candidates(&self) -> &FuzzyCandidates {
+        self.fuzzy.get_or_init(|| {
+            let texts = self
+                .files
+                .iter()
+                .map(|file| String::from_utf8_lossy(&file.content))
+                .collect::<Vec<_>>();
+            let buckets = scan_package_contents(
+                self.files
+                    .iter()
+                    .zip(&texts)
+                    .map(|(file, text)| (file.path.as_path(), &text[..])),
+            );
+            FuzzyCandidates::new(all_packages(&buckets))
+        })
+    }
+}
+
+/// Installed package names in scan order, plus a sorted lowercase view so
+/// prefix lookups are a binary search instead of a full scan.
+#[derive(Debug)]
+struct FuzzyCandidates {
+    names: Vec<String>,
+    lower: Vec<String>,
+    sorted: Vec<usize>,
+}
+
+impl FuzzyCandidates {
+    fn new(names: Vec<String>) -> Self {
+        let lower = names
+            .iter()
+            .map(|name| name.to_ascii_lowercase())
+            .collect::<Vec<_>>();
+        let mut sorted = (0..names.len()).collect::<Vec<_>>();
+        // Stable sort keeps scan order among equal keys.
+        sorted.sort_by_key(|&idx| lower[idx].as_str());
+        Self {
+            names,
+            lower,
+            sorted,
+        }
+    }
+
+    /// Exact (case-insensitive), then prefix, then substring match; ties go to
+    /// the earliest name in scan order.
+    fn best_match(&self, query: &str) -> Option<&str> {
+        let query = query.to_ascii_lowercase();
+        let start = self
+            .sorted
+            .partition_point(|&idx| self.lower[idx].as_str() < query.as_str());
+        let prefixed = self.sorted[start..]
+            .iter()
+            .copied()
+            .take_while(|&idx| self.lower[idx].starts_with(&query));
+
+        let exact = prefixed
+            .clone()
+            .take_while(|&idx| self.lower[idx] == query)
+            .next();
+        exact
+            .or_else(|| prefixed.min())
+            .or_else(|| self.lower.iter().position(|lower| lower.contains(&query)))
+            .map(|idx| self.names[idx].as_str())
+    }
+}
+
+/// On-disk copy of the tree walk and fuzzy package scan, so a fresh process
+/// can skip both while the repo's `.nix` files are unchanged.
+///
+/// File contents are not persisted: reading them back from a cache file would
+/// cost as much as reading the sources.
+#[derive(Debug, Serialize, Deserialize)]
+struct PersistedIndex {
+    schema_version: u64,
+    repo: PathBuf,
+    dirs: Vec<FileSnapshot>,
+    files: Vec<FileSnapshot>,
+    packages: Vec<String>,
 }
 
 #[derive(Debug)]
 struct FinderIndexEntry {
     rebuilds: usize,
+    dirs: Vec<FileSnapshot>,
     index: Arc<FinderIndex>,
 }
 
@@ -56,15 +184,37 @@ static FINDER_INDEX_CACHE: LazyLock<Mutex<FinderIndexCache>> =
     LazyLock::new(|| Mutex::new(FinderIndexCache::default()));
 
 pub fn find_package(name: &str, repo_root: &Path) -> anyhow::Result<Option<PackageLocation>> {
+    let index = finder_index(repo_root)?;
+    find_in_index(&index, name)
+}
+
+/// Location of the first of `names` that is installed, checked in order.
+///
+/// All names are matched against one index snapshot, so the freshness check
+/// (a stat per nix file) runs once rather than once per name.
+pub fn find_first_package<'a>(
+    names: impl IntoIterator<Item = &'a str>,
+    repo_root: &Path,
+) -> anyhow::Result<Option<PackageLocation>> {
+    let index = finder_index(repo_root)?;
+    for name in names {
+        if let Some(location) = find_in_index(&index, name)? {
+            return Ok(Some(location));
+        }
+    }
+    Ok(None)
+}
+
+fn find_in_index(index: &FinderIndex, name: &str) -> anyhow::Result<Option<PackageLocation>> {
     let mapped = normalize_name(name);
-    let mapped_location = find_package_exact(&mapped, repo_root)?;
+    let mapped_location = find_exact_in_index(index, &mapped)?;
     if mapped_location.is_some() {
         return Ok(mapped_location);
     }
     if mapped.eq_ignore_ascii_case(name) {
         return Ok(None);
     }
-    find_package_exact(name, repo_root)
+    find_exact_in_index(index, name)
 }
 
 pub fn find_package_fuzzy(name: &str, repo_root: &Path) -> anyhow::Result<Option<PackageMatch>> {
@@ -75,13 +225,17 @@ pub fn find_package_fuzzy(name: &str, repo_root: &Path) -> anyhow::Result<Option
         }));
     }
 
-    let buckets = scan_packages(repo_root)?;
-    let all_candidates = all_packages(&buckets);
-    if let Some(candidate) = find_fuzzy_match(name, &all_candidates)
-        && let Some(location) = find_package_exact(&candidate, repo_root)?
+    let index = finder_index(repo_root)?;
+    let scanned = index.fuzzy.get().is_none();
+    let candidates = index.fuzzy_candidates();
+    if scanned {
+        persist_finder_index(repo_root, &index);
+    }
+    if let Some(candidate) = candidates.best_match(name)
+        && let Some(location) = find_exact_in_index(&index, candidate)?
     {
         return Ok(Some(PackageMatch {
-            name: candidate,
+            name: candidate.to_string(),
             location,
         }));
     }
@@ -101,20 +255,19 @@ fn finder_index_rebuilds(repo_root: &Path) -> usize {
         .map_or(0, |entry| entry.rebuilds)
 }
 
-fn find_package_exact(name: &str, repo_root: &Path) -> anyhow::Result<Option<PackageLocation>> {
+fn find_exact_in_index(index: &FinderIndex, name: &str) -> anyhow::Result<Option<PackageLocation>> {
     let escaped = regex::escape(name);
-    let patterns = build_patterns(&escaped)?;
-    let index = finder_index(repo_root)?;
+    let pattern = build_pattern(&escaped)?;
 
     for indexed_file in &index.files {
-        for (line_index, line) in indexed_file.lines.iter().enumerate() {
-            if line.trim_start().starts_with('#') {
+        for (line_index, line) in indexed_file.lines().enumerate() {
+            if line.trim_ascii_start().starts_with(b"#") {
                 continue;
             }
             if is_alias_rhs_for(line, name) {
                 continue;
             }
-            if patterns.iter().any(|pattern| pattern.is_match(line)) {
+            if pattern.is_match(line) {
                 let output_path = fs::canonicalize(&indexed_file.path)
                     .unwrap_or_else(|_| indexed_file.path.clone());
                 let location = PackageLocation::parse(&format!(
@@ -132,31 +285,58 @@ fn find_package_exact(name: &str, repo_root: &Path) -> anyhow::Result<Option<Pac
 
 fn finder_index(repo_root: &Path) -> anyhow::Result<Arc<FinderIndex>> {
     let repo_key = canonical_repo_key(repo_root);
-    let snapshots = collect_file_snapshots(&repo_key)?;
-
-    {
+    let cached = {
         let cache = FINDER_INDEX_CACHE
             .lock()
             .expect("finder index cache lock should not be poisoned");
-        if let Some(entry) = cache.by_repo.get(&repo_key)
-            && entry.index.snapshots == snapshots
-        {
-            return Ok(Arc::clone(&entry.index));
-        }
+        cache
+            .by_repo
+            .get(&repo_key)
+            .map(|entry| (entry.dirs.clone(), Arc::clone(&entry.index)))
+    };
+
+    // A fresh process falls back to the index persisted by an earlier run.
+    let persisted = if cached.is_none() {
+        persisted_index_path().and_then(|path| load_persisted_index(&path, &repo_key))
+    } else {
+        None
+    };
+    let known = cached
+        .map(|(dirs, index)| (dirs, snapshot_paths(&index.snapshots)))
+        .or_else(|| {
+            persisted
+                .as_ref()
+                .map(|persisted| (persisted.dirs.clone(), snapshot_paths(&persisted.files)))
+        });
+
+    let (dirs, snapshots) = match known {
+        // Unchanged directory mtimes mean no files were added, removed, or
+        // renamed, so re-stat the known files instead of walking the tree.
+        Some((dirs, paths)) if snapshots_current(&dirs) => (dirs, collect_file_snapshots(paths)?),
+        _ => collect_tree_snapshots(&repo_key)?,
+    };
+
+    if let Some(index) = reuse_cached_index(&repo_key, &dirs, &snapshots) {
+        return Ok(index);
     }
 
     // Build outside the cache lock to avoid serializing disk IO across callers.
-    let built_index = Arc::new(build_finder_index(&snapshots)?);
+    let built_index = build_finder_index(&snapshots)?;
+    if let Some(persisted) = persisted
+        && persisted.files == snapshots
+    {
+        let _ = built_index
+            .fuzzy
+            .set(FuzzyCandidates::new(persisted.packages));
+    }
+    let built_index = Arc::new(built_index);
+    if let Some(index) = reuse_cached_index(&repo_key, &dirs, &snapshots) {
+        return Ok(index);
+    }
 
     let mut cache = FINDER_INDEX_CACHE
         .lock()
         .expect("finder index cache lock should not be poisoned");
-    if let Some(entry) = cache.by_repo.get(&repo_key)
-        && entry.index.snapshots == snapshots
-    {
-        return Ok(Arc::clone(&entry.index));
-    }
-
     let rebuilds = cache
         .by_repo
         .get(&repo_key)
@@ -166,19 +346,113 @@ fn finder_index(repo_root: &Path) -> anyhow::Result<Arc<FinderIndex>> {
         repo_key,
         FinderIndexEntry {
             rebuilds,
+            dirs,
             index: Arc::clone(&built_index),
         },
     );
     Ok(built_index)
 }
 
+/// Return the cached index when file signatures still match, refreshing its
+/// directory snapshot so the walk-free fast path stays available.
+fn reuse_cached_index(
+    repo_key: &Path,
+    dirs: &[FileSnapshot],
+    snapshots: &[FileSnapshot],
+) -> Option<Arc<FinderIndex>> {
+    let mut cache = FINDER_INDEX_CACHE
+        .lock()
+        .expect("finder index cache lock should not be poisoned");
+    let entry = cache.by_repo.get_mut(repo_key)?;
+    if entry.index.snapshots != snapshots {
+        return None;
+    }
+    if entry.dirs != dirs {
+        entry.dirs = dirs.to_vec();
+    }
+    Some(Arc::clone(&entry.index))
+}
+
+fn persisted_index_path() -> Option<PathBuf> {
+    // Unit tests build throwaway repos; keep them out of the real cache.
+    if cfg!(test) {
+        return None;
+    }
+    Some(
+        crate::app::dirs_home()
+            .join(".cache/nx")
+            .join(FINDER_INDEX_FILENAME),
+    )
+}
+
+/// Load the persisted index for `repo_key`.
+///
+/// Returns `None` on missing file, parse error, schema mismatch, or another repo.
+fn load_persisted_index(path: &Path, repo_key: &Path) -> Option<PersistedIndex> {
+    let content = fs::read_to_string(path).ok()?;
+    let persisted = serde_json::from_str::<PersistedIndex>(&content).ok()?;
+    (persisted.schema_version == FINDER_INDEX_SCHEMA_VERSION && persisted.repo == repo_key)
+        .then_some(persisted)
+}
+
+fn save_persisted_index(path: &Path, persisted: &PersistedIndex) -> anyhow::Result<()> {
+    if let Some(parent) = path.parent() {
+        fs::create_dir_all(parent)
+            .with_context(|| format!("creating cache dir {}", parent.display()))?;
+    }
+    let json = serde_json::to_string(persisted).context("serializing finder index")?;
+    fs::write(path, json).with_context(|| format!("writing cache file {}", path.display()))
+}
+
+/// Best-effort write of a freshly scanned index; a failed write only costs a rescan.
+fn persist_finder_index(repo_root: &Path, index: &FinderIndex) {
+    let Some(path) = persisted_index_path() else {
+        return;
+    };
+    let repo_key = canonical_repo_key(repo_root);
+    let dirs = {
+        let cache = FINDER_INDEX_CACHE
+            .lock()
+            .expect("finder index cache lock should not be poisoned");
+        cache.by_repo.get(&repo_key).map(|entry| entry.dirs.clone())
+    };
+    let Some(dirs) = dirs else {
+        return;
+    };
+    let persisted = PersistedIndex {
+        schema_version: FINDER_INDEX_SCHEMA_VERSION,
+        repo: repo_key,
+        dirs,
+        files: index.snapshots.clone(),
+        packages: index.fuzzy_candidates().names.clone(),
+    };
+    let _ = save_persisted_index(&path, &persisted);
+}
+
 fn canonical_repo_key(repo_root: &Path) -> PathBuf {
     fs::canonicalize(repo_root).unwrap_or_else(|_| repo_root.to_path_buf())
 }
 
-fn collect_file_snapshots(repo_root: &Path) -> anyhow::Result<Vec<FileSnapshot>> {
+fn collect_tree_snapshots(
+    repo_root: &Path,
+) -> anyhow::Result<(Vec<FileSnapshot>, Vec<FileSnapshot>)> {
+    let tree = collect_nix_tree(repo_root);
+    let dirs = tree
+        .dirs
+        .into_iter()
+        .map(|(path, metadata)| FileSnapshot {
+            path,
+            signature: file_signature(&metadata),
+        })
+        .collect();
+    Ok((dirs, collect_file_snapshots(tree.files)?))
+}
+
+fn collect_file_snapshots(
+    paths: impl IntoIterator<Item = PathBuf>,
+) -> anyhow::Result<Vec<FileSnapshot>> {
     let mut out = Vec::new();
-    for path in collect_nix_files(repo_root) {
+    for path in paths {
         let metadata =
             fs::metadata(&path).with_context(|| format!("reading {}", path.display()))?;
         out.push(FileSnapshot {
@@ -189,6 +463,20 @@ fn collect_file_snapshots(repo_root: &Path) -> anyhow::Result<Vec<FileSnapshot>>
     Ok(out)
 }
 
+fn snapshot_paths(snapshots: &[FileSnapshot]) -> Vec<PathBuf> {
+    snapshots
+        .iter()
+        .map(|snapshot| snapshot.path.clone())
+        .collect()
+}
+
+fn snapshots_current(snapshots: &[FileSnapshot]) -> bool {
+    snapshots.iter().all(|snapshot| {
+        fs::metadata(&snapshot.path)
+            .is_ok_and(|metadata| file_signature(&metadata) == snapshot.signature)
+    })
+}
+
 fn file_signature(metadata: &fs::Metadata) -> FileSignature {
     let mtime_ns = metadata
         .modified()
@@ -204,72 +492,44 @@ fn file_signature(metadata: &fs::Metadata) -> FileSignature {
 fn build_finder_index(snapshots: &[FileSnapshot]) -> anyhow::Result<FinderIndex> {
     let mut files = Vec::with_capacity(snapshots.len());
     for snapshot in snapshots {
-        let content = fs::read_to_string(&snapshot.path)
+        let content = fs::read(&snapshot.path)
             .with_context(|| format!("reading {}", snapshot.path.display()))?;
-        files.push(IndexedFile {
-            path: snapshot.path.clone(),
-            lines: content.lines().map(str::to_string).collect(),
-        });
+        files.push(IndexedFile::new(snapshot.path.clone(), content));
     }
     Ok(FinderIndex {
         snapshots: snapshots.to_vec(),
         files,
+        fuzzy: OnceLock::new(),
     })
 }
 
-fn build_patterns(escaped_name: &str) -> anyhow::Result<Vec<Regex>> {
-    let raw_patterns = [
-        format!(r"(?i)^\s+{escaped_name}\s*(#.*)?$"),
-        format!(r"(?i)^\s+\S+\.{escaped_name}\s*(#.*)?$"),
-        format!(r"(?i)^\s+pkgs\.{escaped_name}\b"),
-        format!(r#"(?i)^\s*"{escaped_name}""#),
-        format!(r"(?i)^\s*programs\.{escaped_name}(?:\.enable|\s*=)"),
-        format!(r"(?i)^\s*services\.{escaped_name}(?:\.enable|\s*=)"),
-        format!(r"(?i)^\s*launchd\.(?:user\.)?agents\.{escaped_name}\s*="),
+/// Compile every line shape a package can appear in as one alternation, so
+/// each line is matched in a single pass instead of once per shape.
+fn build_pattern(escaped_name: &str) -> anyhow::Result<Regex> {
+    let branches = [
+        format!(r"^\s+{escaped_name}\s*(?:#.*)?$"),
+        format!(r"^\s+\S+\.{escaped_name}\s*(?:#.*)?$"),
+        format!(r"^\s+pkgs\.{escaped_name}\b"),
+        format!(r#"^\s*"{escaped_name}""#),
+        format!(r"^\s*programs\.{escaped_name}(?:\.enable|\s*=)"),
+        format!(r"^\s*services\.{escaped_name}(?:\.enable|\s*=)"),
+        format!(r"^\s*launchd\.(?:user\.)?agents\.{escaped_name}\s*="),
     ];
 
-    raw_patterns
-        .into_iter()
-        .map(|pattern| Regex::new(&pattern))
-        .collect::<Result<Vec<_>, _>>()
-        .context("invalid search pattern")
+    Regex::new(&format!("(?i)(?:{})", branches.join(")|(?:"))).context("invalid search pattern")
 }
 
-fn is_alias_rhs_for(line: &str, name: &str) -> bool {
-    if !line.contains('=') {
+fn is_alias_rhs_for(line: &[u8], name: &str) -> bool {
+    let Some(eq) = line.iter().position(|&byte| byte == b'=') else {
         return false;
-    }
-    let mut parts = line.splitn(2, '=');
-    let _ = parts.next();
-    let rhs = parts.next().unwrap_or_default();
+    };
     let quoted = format!("\"{name}\"");
-    rhs.contains(&quoted)
+    line[eq + 1..]
+        .windows(quoted.len())
+        .any(|window| window == quoted.as_bytes())
 }
 
-fn find_fuzzy_match(query: &str, candidates: &[String]) -> Option<String> {
-    let query_lower = query.to_ascii_lowercase();
-
-    if let Some(exact) = candidates
-        .iter()
-        .find(|candidate| candidate.eq_ignore_ascii_case(query))
-    {
-        return Some(exact.clone());
-    }
-
-    if let Some(prefix) = candidates
-        .iter()
-        .find(|candidate| candidate.to_ascii_lowercase().starts_with(&query_lower))
-    {
-        return Some(prefix.clone());
-    }
-
-    candidates
-        .iter()
-        .find(|candidate| candidate.to_ascii_lowercase().contains(&query_lower))
-        .cloned()
-}
-
-fn all_packages(buckets: &crate::infra::config_scan::PackageBuckets) -> Vec<String> {
+fn all_packages(buckets: &PackageBuckets) -> Vec<String> {
     let mut out = Vec::new();
     let mut seen = HashSet::new();
 
@@ -333,6 +593,25 @@ mod tests {
         );
     }
 
+    #[test]
+    fn find_first_package_returns_first_installed_name_in_order() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let root = tmp.path();
+
+        write_nix(
+            root,
+            "packages/nix/cli.nix",
+            "{ pkgs }:\n[\n  fd\n  ripgrep\n]\n",
+        );
+
+        let found = find_first_package(["bat", "ripgrep", "fd"], root)
+            .unwrap()
+            .expect("an installed name should be found");
+        assert_eq!(found.line(), Some(4));
+
+        assert!(find_first_package(["bat", "eza"], root).unwrap().is_none());
+    }
+
     #[test]
     fn find_package_uses_shared_alias_normalization() {
         let tmp = TempDir::new().expect("temp dir should be created");
@@ -404,6 +683,80 @@ mod tests {
         assert_eq!(finder_index_rebuilds(root), 2);
     }
 
+    #[test]
+    fn finder_index_detects_files_added_to_existing_dirs() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let root = tmp.path();
+
+        write_nix(
+            root,
+            "packages/nix/cli.nix",
+            r"{ pkgs }:
+[
+  ripgrep
+]
+",
+        );
+
+        let first = find_package("ripgrep", root).expect("finder lookup should succeed");
+        assert!(first.is_some(), "expected initial package to resolve");
+        assert_eq!(finder_index_rebuilds(root), 1);
+
+        thread::sleep(Duration::from_millis(2));
+        write_nix(
+            root,
+            "packages/nix/tools/extra.nix",
+            r"{ pkgs }:
+[
+  fd
+]
+",
+        );
+
+        let added = find_package("fd", root).expect("finder lookup should succeed");
+        assert!(added.is_some(), "expected package in new file to resolve");
+        assert_eq!(finder_index_rebuilds(root), 2);
+
+        let cached = find_package("fd", root).expect("finder lookup should succeed");
+        assert!(cached.is_some(), "expected cached lookup to resolve");
+        assert_eq!(finder_index_rebuilds(root), 2);
+    }
+
+    #[test]
+    fn find_package_tolerates_non_utf8_files() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let root = tmp.path();
+
+        write_nix(
+            root,
+            "packages/nix/cli.nix",
+            r"{ pkgs }:
+[
+  ripgrep
+]
+",
+        );
+        let latin1 = root.join("packages/nix/latin1.nix");
+        fs::write(&latin1, b"# caf\xe9\n[\n  fd\n]\n").expect("latin-1 content should be written");
+
+        let found = find_package("fd", root).expect("finder lookup should succeed");
+        assert_eq!(found.and_then(|location| location.line()), Some(3));
+        let found = find_package("ripgrep", root).expect("finder lookup should succeed");
+        assert!(found.is_some(), "expected utf-8 file to still resolve");
+    }
+
+    #[test]
+    fn indexed_file_lines_match_str_lines() {
+        for content in ["", "\n", "a\n", "a\n\nb", "a\r\nb\r\n", "a\r", "  x\n  y"] {
+            let indexed = IndexedFile::new(PathBuf::from("test.nix"), content.as_bytes().to_vec());
+            assert_eq!(
+                indexed.lines().collect::<Vec<_>>(),
+                content.lines().map(str::as_bytes).collect::<Vec<_>>(),
+                "line split mismatch for {content:?}"
+            );
+        }
+    }
+
     #[test]
     fn find_package_fuzzy_prefers_exact_match() {
         let tmp = TempDir::new().expect("temp dir should be created");
@@ -452,6 +805,28 @@ mod tests {
         assert_eq!(found.location.line(), Some(5));
     }
 
+    #[test]
+    fn fuzzy_candidates_break_ties_by_scan_order() {
+        let candidates = FuzzyCandidates::new(vec![
+            "stylua".to_string(),
+            "lua5_4".to_string(),
+            "lua-language-server".to_string(),
+            "LUA".to_string(),
+        ]);
+
+        assert_eq!(candidates.best_match("lua"), Some("LUA"));
+        assert_eq!(candidates.best_match("lua-"), Some("lua-language-server"));
+        assert_eq!(candidates.best_match("lua5"), Some("lua5_4"));
+        assert_eq!(candidates.best_match("ylu"), Some("stylua"));
+        assert_eq!(candidates.best_match("zsh"), None);
+
+        let prefix_only = FuzzyCandidates::new(vec![
+            "lua5_4".to_string(),
+            "lua-language-server".to_string(),
+        ]);
+        assert_eq!(prefix_only.best_match("lua"), Some("lua5_4"));
+    }
+
     #[test]
     fn find_package_fuzzy_returns_matched_name_and_location() {
         let tmp = TempDir::new().expect("temp dir should be created");
@@ -473,4 +848,48 @@ mod tests {
         assert_eq!(found.name, "ripgrep");
         assert_eq!(found.location.line(), Some(3));
     }
+
+    #[test]
+    fn persisted_index_round_trips_for_same_repo_only() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let path = tmp.path().join("cache/finder_index.json");
+        let persisted = PersistedIndex {
+            schema_version: FINDER_INDEX_SCHEMA_VERSION,
+            repo: PathBuf::from("/repo"),
+            dirs: Vec::new(),
+            files: vec![FileSnapshot {
+                path: PathBuf::from("/repo/packages/nix/cli.nix"),
+                signature: FileSignature {
+                    mtime_ns: 1_700_000_000_123_456_789,
+                    size: 42,
+                },
+            }],
+            packages: vec!["ripgrep".to_string()],
+        };
+        save_persisted_index(&path, &persisted).expect("index should be written");
+
+        let loaded =
+            load_persisted_index(&path, Path::new("/repo")).expect("index should load back");
+        assert_eq!(loaded.files, persisted.files);
+        assert_eq!(loaded.packages, persisted.packages);
+        assert!(load_persisted_index(&path, Path::new("/other")).is_none());
+    }
+
+    #[test]
+    fn build_pattern_matches_every_line_shape() {
+        let pattern = build_pattern("fd").expect("pattern should compile");
+        for line in [
+            "  fd",
+            "  fd # finder",
+            "  pkgs-unstable.fd",
+            "  pkgs.fd",
+            "\"fd\"",
+            "programs.fd.enable = true;",
+            "services.fd = {",
+            "launchd.user.agents.fd = {",
+        ] {
+            assert!(pattern.is_match(line.as_bytes()), "{line:?} should match");
+        }
+        assert!(!pattern.is_match(b"  fdupes"));
+    }
 }
@@ -1,3 +1,4 @@
+use std::borrow::Cow;
 use std::fs;
 use std::path::Path;
 
@@ -30,29 +31,26 @@ pub fn add_flake_input(
         });
     }
 
-    let mut lines: Vec<String> = content.lines().map(str::to_string).collect();
-    let trailing_newline = content.ends_with('\n');
-
-    let start_idx = lines
-        .iter()
-        .position(|line| inputs_opening_regex().is_match(line))
+    // The edit is located by byte offsets in the file as read and spliced in
+    // place, so the file is never split into owned lines and joined again.
+    let opening = inputs_opening_regex()
+        .find(&content)
         .ok_or_else(|| anyhow::anyhow!("inputs block not found"))?;
-    let end_idx = find_block_end(&lines, start_idx)
+    let start = content[..opening.start()]
+        .rfind('\n')
+        .map_or(0, |newline| newline + 1);
+    let insert_at = find_block_end(&content, start)
         .ok_or_else(|| anyhow::anyhow!("inputs block end not found"))?;
 
-    let base_indent = lines[start_idx]
-        .chars()
-        .take_while(|c| c.is_whitespace())
-        .collect::<String>();
-    let indent = format!("{base_indent}  ");
+    let opening_line = &content[start..];
+    let base_indent = &opening_line[..opening_line.len() - opening_line.trim_start().len()];
     let attr = format_flake_input_attr(&resolved_name);
-    let new_line = format!("{indent}{attr}.url = \"{flake_url}\";");
-    lines.insert(end_idx, new_line);
+    let new_line = format!("{base_indent}  {attr}.url = \"{flake_url}\";\n");
 
-    let mut updated = lines.join("\n");
-    if trailing_newline {
-        updated.push('\n');
-    }
+    let mut updated = String::with_capacity(content.len() + new_line.len());
+    updated.push_str(&content[..insert_at]);
+    updated.push_str(&new_line);
+    updated.push_str(&content[insert_at..]);
 
     fs::write(flake_path, updated).with_context(|| format!("writing {}", flake_path.display()))?;
 
@@ -61,12 +59,21 @@ pub fn add_flake_input(
     })
 }
 
+/// Whether some line declares `<name>.url =` or `"<name>".url =`.
+///
+/// The name differs per call, so this is a direct scan from each line start
+/// rather than a pattern compiled for a single use.
 fn input_exists(content: &str, input_name: &str) -> bool {
-    let escaped = regex::escape(input_name);
-    let pattern = format!(r#"(?m)^\s*("{escaped}"|{escaped})\.url\s*="#);
-    Regex::new(&pattern)
-        .expect("input-exists regex should compile")
-        .is_match(content)
+    let quoted = format!("\"{input_name}\"");
+    std::iter::once(0)
+        .chain(content.match_indices('\n').map(|(newline, _)| newline + 1))
+        .any(|line_start| {
+            let rest = content[line_start..].trim_start();
+            rest.strip_prefix(quoted.as_str())
+                .or_else(|| rest.strip_prefix(input_name))
+                .and_then(|rest| rest.strip_prefix(".url"))
+                .is_some_and(|rest| rest.trim_start().starts_with('='))
+        })
 }
 
 fn inputs_opening_regex() -> &'static Regex {
@@ -74,16 +81,20 @@ fn inputs_opening_regex() -> &'static Regex {
     ONCE.get_or_init(|| Regex::new(r"\binputs\s*=\s*\{").expect("inputs regex should compile"))
 }
 
-fn find_block_end(lines: &[String], start_idx: usize) -> Option<usize> {
+/// Byte offset of the line that closes the block opened on the line starting
+/// at `start`, counting braces line by line from there.
+fn find_block_end(content: &str, start: usize) -> Option<usize> {
     let mut depth = 0isize;
-    for (idx, line) in lines.iter().enumerate().skip(start_idx) {
+    let mut offset = start;
+    for (idx, line) in content[start..].split_inclusive('\n').enumerate() {
         let opens = isize::try_from(line.matches('{').count()).expect("brace count should fit");
         let closes = isize::try_from(line.matches('}').count()).expect("brace count should fit");
         depth += opens;
         depth -= closes;
-        if depth == 0 && idx > start_idx {
-            return Some(idx);
+        if depth == 0 && idx > 0 {
+            return Some(offset);
         }
+        offset += line.len();
     }
     None
 }
@@ -133,14 +144,20 @@ fn derive_flake_input_name(flake_url: &str) -> String {
     }
 }
 
-fn format_flake_input_attr(name: &str) -> String {
-    let valid = Regex::new(r"^[A-Za-z_][A-Za-z0-9_]*$")
-        .expect("flake attr regex should compile")
-        .is_match(name);
-    if valid {
-        name.to_string()
+/// The input name as a Nix attr: bare when it is a plain identifier
+/// (`[A-Za-z_][A-Za-z0-9_]*`, checked byte by byte), quoted otherwise.
+fn format_flake_input_attr(name: &str) -> Cow<'_, str> {
+    let is_identifier = name
+        .bytes()
+        .next()
+        .is_some_and(|first| first.is_ascii_alphabetic() || first == b'_')
+        && name
+            .bytes()
+            .all(|byte| byte.is_ascii_alphanumeric() || byte == b'_');
+    if is_identifier {
+        Cow::Borrowed(name)
     } else {
-        format!("\"{name}\"")
+        Cow::Owned(format!("\"{name}\""))
     }
 }
 
@@ -174,6 +191,9 @@ mod tests {
             "\"nix-community\""
         );
         assert_eq!(format_flake_input_attr("nur"), "nur");
+        assert_eq!(format_flake_input_attr("_nur2"), "_nur2");
+        assert_eq!(format_flake_input_attr("2nur"), "\"2nur\"");
+        assert_eq!(format_flake_input_attr(""), "\"\"");
     }
 
     #[test]
@@ -202,6 +222,41 @@ mod tests {
         assert!(updated.contains("nur.url = \"github:nix-community/NUR\";"));
     }
 
+    #[test]
+    fn add_flake_input_splices_line_before_block_close() {
+        let tmp = TempDir::new().expect("temp dir should be created");
+        let flake = write_flake(
+            &tmp,
+            r#"{
+    inputs = {
+      nixpkgs.url = "github:NixOS/nixpkgs";
+      home-manager = {
+        url = "github:nix-community/home-manager";
+      };
+    };
+    outputs = { self, ... }: { };
+}"#,
+        );
+
+        add_flake_input(&flake, "github:nix-community/NUR", None)
+            .expect("flake input should be added");
+
+        let updated = fs::read_to_string(&flake).expect("updated flake should be readable");
+        assert_eq!(
+            updated,
+            r#"{
+    inputs = {
+      nixpkgs.url = "github:NixOS/nixpkgs";
+      home-manager = {
+        url = "github:nix-community/home-manager";
+      };
+      nur.url = "github:nix-community/NUR";
+    };
+    outputs = { self, ... }: { };
+}"#
+        );
+    }
+
     #[test]
     fn add_flake_input_is_idempotent_when_present() {
         let tmp = TempDir::new().expect("temp dir should be created");
@@ -229,6 +284,24 @@ mod tests {
         assert_eq!(before, after);
     }
 
+    #[test]
+    fn input_exists_matches_bare_and_quoted_url_attrs() {
+        let content = r#"{
+  inputs = {
+    "nix-darwin".url = "github:LnL7/nix-darwin";
+    nur.url
+      = "github:nix-community/NUR";
+    nurx.url = "github:example/nurx";
+  };
+}
+"#;
+        assert!(input_exists(content, "nix-darwin"));
+        assert!(input_exists(content, "nur"));
+        assert!(input_exists(content, "nurx"));
+        assert!(!input_exists(content, "nix"));
+        assert!(!input_exists(content, "inputs"));
+    }
+
     #[test]
     fn add_flake_input_errors_without_inputs_block() {
         let tmp = TempDir::new().expect("temp dir should be created");
@@ -37,7 +37,7 @@ pub fn maybe_refresh_before_system_command(needs_refresh: bool, printer: &Printe
     }
 
     printer.action("Refreshing local nx binary");
-    Printer::detail(&format!(
+    Printer::detail(&format_args!(
         "cargo install --path {} --force",
         source_root.display()
     ));
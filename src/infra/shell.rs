@@ -1,6 +1,6 @@
-use std::io::{BufRead, BufReader, Read};
+use std::io::{ErrorKind, Read};
 use std::path::Path;
-use std::process::{Command, Stdio};
+use std::process::{Command, Output, Stdio};
 use std::sync::mpsc;
 use std::thread;
 
@@ -9,6 +9,12 @@ use serde_json::Value;
 
 use crate::output::printer::Printer;
 
+/// Column budget for streamed child-process output.
+const STREAM_WIDTH: usize = 80;
+
+/// Bytes read from a child stream per read call.
+const STREAM_CHUNK: usize = 64 * 1024;
+
 pub struct CapturedCommand {
     pub code: i32,
     pub stdout: String,
@@ -38,26 +44,40 @@ pub fn git_diff(cwd: &Path) -> String {
         .unwrap_or_default()
 }
 
+/// Capture `git diff` output for a single file.
+pub fn git_diff_path(cwd: &Path, path: &Path) -> String {
+    let path = path.to_string_lossy();
+    run_captured_command("git", &["diff", "--", &path], Some(cwd))
+        .map(|cmd| cmd.stdout)
+        .unwrap_or_default()
+}
+
 pub fn run_captured_command(
     program: &str,
     args: &[&str],
     cwd: Option<&Path>,
 ) -> anyhow::Result<CapturedCommand> {
+    let output = run_raw_command(program, args, cwd)?;
+
+    Ok(CapturedCommand {
+        code: output.status.code().unwrap_or(1),
+        stdout: String::from_utf8_lossy(&output.stdout).into_owned(),
+        stderr: String::from_utf8_lossy(&output.stderr).into_owned(),
+    })
+}
+
+/// Run a command and return its raw output, leaving any decoding to callers
+/// that actually read the streams.
+pub fn run_raw_command(program: &str, args: &[&str], cwd: Option<&Path>) -> anyhow::Result<Output> {
     let mut command = Command::new(program);
     command.args(args);
     if let Some(cwd) = cwd {
         command.current_dir(cwd);
     }
 
-    let output = command
+    command
         .output()
-        .with_context(|| format!("command execution failed ({program})"))?;
-
-    Ok(CapturedCommand {
-        code: output.status.code().unwrap_or(1),
-        stdout: String::from_utf8_lossy(&output.stdout).into_owned(),
-        stderr: String::from_utf8_lossy(&output.stderr).into_owned(),
-    })
+        .with_context(|| format!("command execution failed ({program})"))
 }
 
 pub fn run_indented_command(
@@ -93,14 +113,7 @@ pub fn run_indented_command(
     let stdout_handle = spawn_line_reader("stdout", stdout, tx.clone());
     let stderr_handle = spawn_line_reader("stderr", stderr, tx);
 
-    for line in rx {
-        let trimmed = line.trim_end();
-        if trimmed.is_empty() {
-            println!();
-        } else {
-            Printer::stream_line(trimmed, indent, 80);
-        }
-    }
+    echo_streamed_lines(&rx, indent, |_| {});
 
     join_reader("stdout", stdout_handle)?;
     join_reader("stderr", stderr_handle)?;
@@ -144,18 +157,12 @@ pub fn run_indented_command_collecting(
     let stderr_handle = spawn_line_reader("stderr", stderr, tx);
 
     let mut collected = String::new();
-    for line in rx {
-        let trimmed = line.trim_end();
+    echo_streamed_lines(&rx, indent, |trimmed| {
         if !collected.is_empty() {
             collected.push('\n');
         }
         collected.push_str(trimmed);
-        if trimmed.is_empty() {
-            println!();
-        } else {
-            Printer::stream_line(trimmed, indent, 80);
-        }
-    }
+    });
 
     join_reader("stdout", stdout_handle)?;
     join_reader("stderr", stderr_handle)?;
@@ -164,18 +171,71 @@ pub fn run_indented_command_collecting(
     Ok((status.code().unwrap_or(1), collected))
 }
 
+/// Echo child output under `indent` until both reader threads hang up.
+///
+/// Chunks already queued behind the one just received are rendered with it
+/// and written together, so a fast producer costs one write per wakeup rather
+/// than one per line.
+fn echo_streamed_lines(rx: &mpsc::Receiver<String>, indent: &str, mut on_line: impl FnMut(&str)) {
+    let max_content = Printer::stream_content_width(indent, STREAM_WIDTH);
+    let mut out = String::new();
+    while let Ok(first) = rx.recv() {
+        out.clear();
+        for chunk in std::iter::once(first).chain(rx.try_iter()) {
+            for line in chunk.lines() {
+                let trimmed = line.trim_end();
+                on_line(trimmed);
+                if trimmed.is_empty() {
+                    out.push('\n');
+                } else {
+                    Printer::push_stream_line(&mut out, trimmed, indent, max_content);
+                }
+            }
+        }
+        Printer::write_block(&out);
+    }
+}
+
+/// Forward a child stream as chunks of whole lines.
+///
+/// Each read takes up to `STREAM_CHUNK` bytes and every complete line in it
+/// is sent as one String, so a chatty child costs one allocation and one
+/// channel send per read rather than per line. A partial trailing line is
+/// carried into the next read; one left at end of stream is sent as is.
 fn spawn_line_reader(
     stream_name: &'static str,
-    stream: impl Read + Send + 'static,
+    mut stream: impl Read + Send + 'static,
     tx: mpsc::Sender<String>,
 ) -> thread::JoinHandle<anyhow::Result<()>> {
     thread::spawn(move || {
-        for line in BufReader::new(stream).lines() {
-            let line = line.with_context(|| format!("reading {stream_name} stream"))?;
-            if tx.send(line).is_err() {
-                break;
+        let mut buf = vec![0; STREAM_CHUNK];
+        let mut pending = Vec::new();
+        loop {
+            let read = match stream.read(&mut buf) {
+                Ok(0) => break,
+                Ok(read) => read,
+                Err(err) if err.kind() == ErrorKind::Interrupted => continue,
+                Err(err) => {
+                    return Err(err).with_context(|| format!("reading {stream_name} stream"));
+                }
+            };
+            let carried = pending.len();
+            pending.extend_from_slice(&buf[..read]);
+            let Some(last_newline) = buf[..read].iter().rposition(|&byte| byte == b'\n') else {
+                continue;
+            };
+            let rest = pending.split_off(carried + last_newline + 1);
+            let lines = String::from_utf8(std::mem::replace(&mut pending, rest))
+                .with_context(|| format!("reading {stream_name} stream"))?;
+            if tx.send(lines).is_err() {
+                return Ok(());
             }
         }
+        if !pending.is_empty() {
+            let tail = String::from_utf8(pending)
+                .with_context(|| format!("reading {stream_name} stream"))?;
+            let _ = tx.send(tail);
+        }
         Ok(())
     })
 }
@@ -196,8 +256,6 @@ mod tests {
     use std::fs;
     use std::io;
 
-    use crate::output::style::OutputStyle;
-
     struct FailingReader;
 
     impl Read for FailingReader {
@@ -208,7 +266,7 @@ mod tests {
 
     #[test]
     fn run_indented_command_surfaces_spawn_failure() {
-        let printer = Printer::new(OutputStyle::from_flags(true, false, false));
+        let printer = Printer::plain();
         let args: &[&str] = &[];
         let err = run_indented_command("__nx_missing_command__", args, None, &printer, "  ")
             .expect_err("missing command should fail to spawn");
@@ -229,6 +287,27 @@ mod tests {
         assert!(err.to_string().contains("reading stderr stream"));
     }
 
+    #[test]
+    fn line_reader_sends_whole_lines_and_trailing_partial_line() {
+        let (tx, rx) = mpsc::channel::<String>();
+        let handle =
+            spawn_line_reader("stdout", io::Cursor::new(b"one\ntwo\n\nthree".to_vec()), tx);
+        join_reader("stdout", handle).expect("reader should finish");
+
+        let chunks: Vec<String> = rx.try_iter().collect();
+        let lines: Vec<&str> = chunks.iter().flat_map(|chunk| chunk.lines()).collect();
+        assert_eq!(lines, vec!["one", "two", "", "three"]);
+    }
+
+    #[test]
+    fn join_reader_surfaces_invalid_utf8() {
+        let (tx, _rx) = mpsc::channel::<String>();
+        let handle = spawn_line_reader("stdout", io::Cursor::new(b"ok\n\xff\n".to_vec()), tx);
+
+        let err = join_reader("stdout", handle).expect_err("invalid output should be surfaced");
+        assert!(err.to_string().contains("reading stdout stream"));
+    }
+
     #[test]
     fn join_reader_surfaces_thread_panic() {
         let handle = thread::spawn(|| -> anyhow::Result<()> {
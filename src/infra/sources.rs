@@ -2,19 +2,20 @@ use std::collections::{HashMap, HashSet};
 use std::fs;
 use std::path::Path;
 use std::process::Command;
-use std::sync::mpsc;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::{LazyLock, Mutex, mpsc};
 use std::thread;
 use std::time::Duration;
 
 use serde_json::Value;
 
 use crate::domain::source::{
-    ExplicitSourceTarget, NixSearchEntry, OVERLAY_PACKAGES, PackageSource, SourcePreferences,
-    SourceResult, check_platforms, clean_attr_path, deduplicate_results, detect_language_package,
-    get_current_system, mapped_name, parse_nix_search_results, score_match, search_name_variants,
-    sort_results,
+    ExplicitSourceTarget, MatchScorer, NixSearchEntry, OVERLAY_PACKAGES, PackageSource,
+    SourcePreferences, SourceResult, check_platforms, clean_attr_path, deduplicate_results,
+    detect_language_package, get_current_system, mapped_name, parse_nix_search_results,
+    search_name_variants, sort_results,
 };
-use crate::infra::shell::run_json_command_quiet;
+use crate::infra::cache::{EVAL_TTL, SEARCH_TTL, cached_json_command};
 
 // --- Shell Helpers
 
@@ -32,13 +33,30 @@ fn command_available(name: &str) -> bool {
 fn eval_nix_attr(targets: &[&str], attr_path: &str) -> Option<Value> {
     for target in targets {
         let full_attr = format!("{target}#{attr_path}");
-        if let Some(val) = run_json_command_quiet("nix", &["eval", "--json", &full_attr]) {
+        if let Some(val) = cached_json_command("nix", &["eval", "--json", &full_attr], EVAL_TTL) {
             return Some(val);
         }
     }
     None
 }
 
+/// Evaluate `apply` against an attribute, trying each target in order, and
+/// report which target answered.
+fn eval_nix_attr_applied<'t>(
+    targets: &[&'t str],
+    attr_path: &str,
+    apply: &str,
+) -> Option<(&'t str, Value)> {
+    for &target in targets {
+        let installable = format!("{target}#{attr_path}");
+        let args = ["eval", "--json", &installable, "--apply", apply];
+        if let Some(val) = cached_json_command("nix", &args, EVAL_TTL) {
+            return Some((target, val));
+        }
+    }
+    None
+}
+
 /// Get a single entry from `brew info --json=v2`.
 fn get_homebrew_info_entry(name: &str, is_cask: bool) -> Option<Value> {
     if !command_available("brew") {
@@ -51,16 +69,14 @@ fn get_homebrew_info_entry(name: &str, is_cask: bool) -> Option<Value> {
     }
     args.push(name);
 
-    let data = run_json_command_quiet("brew", &args)?;
+    let mut data = cached_json_command("brew", &args, SEARCH_TTL)?;
     let key = if is_cask { "casks" } else { "formulae" };
-    let entries = data.get(key)?.as_array()?;
-    let entry = entries.first()?;
-
-    if entry.is_object() {
-        Some(entry.clone())
-    } else {
-        None
-    }
+    // The parsed output is discarded afterwards, so the entry is moved out of
+    // it rather than deep-cloned.
+    let Value::Array(entries) = data.get_mut(key)?.take() else {
+        return None;
+    };
+    entries.into_iter().next().filter(Value::is_object)
 }
 
 // --- Individual Source Searches
@@ -83,10 +99,9 @@ fn search_nix_source(
 
     for search_name in search_name_variants(name) {
         for target in targets {
-            if let Some(data) =
-                run_json_command_quiet("nix", &["search", "--json", target, &search_name])
-            {
-                for entry in parse_nix_search_results(&data) {
+            let args = ["search", "--json", target, &search_name];
+            if let Some(data) = cached_json_command("nix", &args, SEARCH_TTL) {
+                for entry in parse_nix_search_results(data) {
                     if !entry.attr_path.is_empty() && seen_attrs.insert(entry.attr_path.clone()) {
                         all_entries.push(entry);
                     }
@@ -100,45 +115,43 @@ fn search_nix_source(
         return Vec::new();
     }
 
-    let mut results: Vec<SourceResult> = all_entries
-        .iter()
+    // Every entry is scored but only the best few are kept, so the cleaned
+    // attr and the other owned result fields are built after ranking, for the
+    // survivors alone.
+    let scorer = MatchScorer::new(&resolved);
+    let mut ranked: Vec<(f64, NixSearchEntry)> = all_entries
+        .into_iter()
         .filter_map(|entry| {
-            let score = score_match(&resolved, &entry.attr_path, &entry.pname);
-            if score < 0.3 {
-                return None;
-            }
+            let score = scorer.score(&entry.attr_path, &entry.pname);
+            (score >= 0.3).then_some((score, entry))
+        })
+        .collect();
 
+    ranked.sort_by(|a, b| b.0.partial_cmp(&a.0).unwrap_or(std::cmp::Ordering::Equal));
+    ranked.truncate(5);
+
+    ranked
+        .into_iter()
+        .map(|(score, entry)| {
             let attr_clean = clean_attr_path(&entry.attr_path).to_string();
             let description = if entry.description.len() > 100 {
                 format!("{}...", &entry.description[..97])
             } else {
-                entry.description.clone()
+                entry.description
             };
 
-            Some(SourceResult {
+            SourceResult {
                 name: name.to_string(),
                 source,
                 attr: Some(attr_clean),
-                version: if entry.version.is_empty() {
-                    None
-                } else {
-                    Some(entry.version.clone())
-                },
+                version: (!entry.version.is_empty()).then_some(entry.version),
                 confidence: score,
                 description,
                 requires_flake_mod,
                 flake_url: flake_url.map(String::from),
-            })
+            }
         })
-        .collect();
-
-    results.sort_by(|a, b| {
-        b.confidence
-            .partial_cmp(&a.confidence)
-            .unwrap_or(std::cmp::Ordering::Equal)
-    });
-    results.truncate(5);
-    results
+        .collect()
 }
 
 /// Search nixpkgs for a package.
@@ -164,6 +177,20 @@ pub fn search_nur(name: &str) -> Vec<SourceResult> {
 
 /// Check existing flake inputs for package overlays.
 pub fn search_flake_inputs(name: &str, flake_lock_path: &Path) -> Vec<SourceResult> {
+    // Overlay -> (package, lowercase package) index, inverted once from the
+    // domain's package -> overlay table instead of on every search.
+    static OVERLAY_INPUT_PACKAGES: LazyLock<HashMap<&str, Vec<(&str, String)>>> =
+        LazyLock::new(|| {
+            let mut index: HashMap<&str, Vec<(&str, String)>> = HashMap::new();
+            for (&pkg, &(overlay, _, _)) in OVERLAY_PACKAGES.iter() {
+                index
+                    .entry(overlay)
+                    .or_default()
+                    .push((pkg, pkg.to_lowercase()));
+            }
+            index
+        });
+
     let Ok(content) = fs::read_to_string(flake_lock_path) else {
         return Vec::new();
     };
@@ -176,12 +203,6 @@ pub fn search_flake_inputs(name: &str, flake_lock_path: &Path) -> Vec<SourceResu
         return Vec::new();
     };
 
-    // Build overlay->packages index from domain OVERLAY_PACKAGES (package->overlay).
-    let mut overlay_to_pkgs: HashMap<&str, Vec<&str>> = HashMap::new();
-    for (&pkg, &(overlay, _, _)) in OVERLAY_PACKAGES.iter() {
-        overlay_to_pkgs.entry(overlay).or_default().push(pkg);
-    }
-
     let search_name = mapped_name(name).to_lowercase();
     let mut results = Vec::new();
 
@@ -190,14 +211,13 @@ pub fn search_flake_inputs(name: &str, flake_lock_path: &Path) -> Vec<SourceResu
             continue;
         }
 
-        let Some(provided) = overlay_to_pkgs.get(input_name.as_str()) else {
+        let Some(provided) = OVERLAY_INPUT_PACKAGES.get(input_name.as_str()) else {
             continue;
         };
 
-        for &pkg in provided {
-            let pkg_lower = pkg.to_lowercase();
-            if search_name.contains(&pkg_lower) || pkg_lower.contains(&search_name) {
-                let confidence = if pkg_lower == search_name { 0.9 } else { 0.7 };
+        for &(pkg, ref pkg_lower) in provided {
+            if search_name.contains(pkg_lower.as_str()) || pkg_lower.contains(&search_name) {
+                let confidence = if *pkg_lower == search_name { 0.9 } else { 0.7 };
                 results.push(SourceResult {
                     name: name.to_string(),
                     source: PackageSource::FlakeInput,
@@ -289,7 +309,30 @@ pub fn search_homebrew(name: &str, is_cask: bool, allow_fallback: bool) -> Vec<S
 ///
 /// Shells out to `nix eval` then delegates to pure `check_platforms`.
 /// Permissive when `nix` is missing or evaluation fails.
+///
+/// The answer depends only on `attr`, so it is memoized for the rest of the
+/// run; platform fallbacks and language validation can ask about the same
+/// attr more than once.
 pub fn check_nix_available(attr: &str) -> (bool, Option<String>) {
+    static CHECKED: LazyLock<Mutex<HashMap<String, (bool, Option<String>)>>> =
+        LazyLock::new(|| Mutex::new(HashMap::new()));
+
+    let lock = || {
+        CHECKED
+            .lock()
+            .expect("nix availability cache lock should not be poisoned")
+    };
+    if let Some(checked) = lock().get(attr) {
+        return checked.clone();
+    }
+    // The lock is not held across the evaluation so concurrent searches are
+    // not serialized behind one `nix eval`.
+    let checked = eval_nix_available(attr);
+    lock().insert(attr.to_string(), checked.clone());
+    checked
+}
+
+fn eval_nix_available(attr: &str) -> (bool, Option<String>) {
     if !command_available("nix") {
         return (true, None);
     }
@@ -308,14 +351,20 @@ fn validate_language_override(name: &str) -> (bool, Option<String>) {
         return (false, Some("nix command unavailable".to_string()));
     }
 
+    // Existence and platforms come back from one evaluation. Forcing `p.name`
+    // keeps the existence check; platforms are only trusted from nixpkgs,
+    // which is where `check_nix_available` looks.
     let targets = &["nixpkgs", "github:nixos/nixpkgs/nixos-unstable"];
-    let name_attr = format!("{name}.name");
+    let apply = "p: { name = p.name; platforms = p.meta.platforms or null; }";
 
-    if eval_nix_attr(targets, &name_attr).is_none() {
+    let Some((target, found)) = eval_nix_attr_applied(targets, name, apply) else {
         return (false, Some("attribute not found in nixpkgs".to_string()));
-    }
+    };
 
-    let (available, reason) = check_nix_available(name);
+    let (available, reason) = match found.get("platforms") {
+        Some(platforms) if target == "nixpkgs" => check_platforms(platforms, get_current_system()),
+        _ => check_nix_available(name),
+    };
     if !available {
         return (false, reason);
     }
@@ -413,6 +462,8 @@ struct SearchFns {
     nxs: SearchByNameFn,
     flake_inputs: SearchByNameAndPathFn,
     nur: SearchByNameFn,
+    homebrew: SearchByNameFn,
+    cask: SearchByNameFn,
 }
 
 #[derive(Clone, Copy)]
@@ -433,12 +484,78 @@ fn search_nur_primary(name: &str) -> SearchCallResult {
     search_nur(name)
 }
 
+fn search_homebrew_primary(name: &str) -> SearchCallResult {
+    search_homebrew(name, false, false)
+}
+
+fn search_cask_primary(name: &str) -> SearchCallResult {
+    search_homebrew(name, true, false)
+}
+
+type SearchJob = Box<dyn FnOnce() + Send>;
+
+/// Search threads kept alive across searches, so a run that searches several
+/// packages reuses them instead of starting fresh ones each time.
+///
+/// A thread is added only when none is idle, so a source still running past
+/// its timeout never holds up a later search.
+struct SearchPool {
+    jobs: mpsc::Sender<SearchJob>,
+    queue: Mutex<mpsc::Receiver<SearchJob>>,
+    idle: AtomicUsize,
+}
+
+impl SearchPool {
+    fn new() -> Self {
+        let (jobs, queue) = mpsc::channel();
+        Self {
+            jobs,
+            queue: Mutex::new(queue),
+            idle: AtomicUsize::new(0),
+        }
+    }
+
+    fn run(&'static self, job: SearchJob) {
+        // Claiming an idle slot reserves a worker that is, or is about to be,
+        // parked on the queue; otherwise a new worker starts with the job.
+        let claimed = self
+            .idle
+            .fetch_update(Ordering::AcqRel, Ordering::Acquire, |idle| {
+                idle.checked_sub(1)
+            })
+            .is_ok();
+        if claimed {
+            let _ = self.jobs.send(job);
+        } else {
+            let _join_handle = thread::spawn(move || self.work(job));
+        }
+    }
+
+    fn work(&self, mut job: SearchJob) {
+        loop {
+            job();
+            self.idle.fetch_add(1, Ordering::AcqRel);
+            let next = self
+                .queue
+                .lock()
+                .expect("search queue lock should not be poisoned")
+                .recv();
+            match next {
+                Ok(next) => job = next,
+                Err(_) => return,
+            }
+        }
+    }
+}
+
+static SEARCH_POOL: LazyLock<SearchPool> = LazyLock::new(SearchPool::new);
+
 fn spawn_search_worker(
     tx: mpsc::Sender<SearchBatch>,
     source: &'static str,
     search: impl FnOnce() -> SearchCallResult + Send + 'static,
 ) {
-    let _join_handle = thread::spawn(move || {
+    SEARCH_POOL.run(Box::new(move || {
         let result = std::panic::catch_unwind(std::panic::AssertUnwindSafe(search));
         let batch = match result {
             Ok(results) => SearchBatch {
@@ -453,12 +570,12 @@ fn spawn_search_worker(
             },
         };
         let _ = tx.send(batch);
-    });
+    }));
 }
 
 /// Execute parallel searches across enabled sources.
 ///
-/// Uses detached workers + `mpsc::channel` + `recv_timeout`.
+/// Uses pooled workers + `mpsc::channel` + `recv_timeout`.
 /// Individual source failures are logged but don't fail the whole search.
 fn parallel_search(
     name: &str,
@@ -474,6 +591,8 @@ fn parallel_search(
         nxs: search_nxs_primary,
         flake_inputs: search_flake_inputs_primary,
         nur: search_nur_primary,
+        homebrew: search_homebrew_primary,
+        cask: search_cask_primary,
     };
 
     parallel_search_with(
@@ -520,11 +639,24 @@ fn parallel_search_with(
     // Optional NUR search
     if prefs.nur || prefs.bleeding_edge {
         let tx_nur = tx.clone();
-        let name = source_name;
+        let name = source_name.clone();
         spawn_search_worker(tx_nur, "nur", move || (search_fns.nur)(&name));
         expected += 1;
     }
 
+    // Homebrew formula + cask alternatives, alongside the nix searches
+    {
+        let tx_homebrew = tx.clone();
+        let name = source_name.clone();
+        spawn_search_worker(tx_homebrew, "homebrew", move || {
+            (search_fns.homebrew)(&name)
+        });
+        let tx_cask = tx.clone();
+        let name = source_name;
+        spawn_search_worker(tx_cask, "cask", move || (search_fns.cask)(&name));
+        expected += 2;
+    }
+
     drop(tx);
 
     let mut all_results = Vec::new();
@@ -600,17 +732,13 @@ fn search_all_sources_with_timeout_reporting(
         return results;
     }
 
-    // 4. Parallel primary search
+    // 4. Parallel primary search, homebrew formula + cask alternatives included
     let mut results = parallel_search(name, prefs, flake_lock_path, warn_on_timeout);
 
-    // 5. Always append homebrew formula + cask alternatives
-    results.extend(search_homebrew(name, false, false));
-    results.extend(search_homebrew(name, true, false));
-
-    // 6. Sort by source priority + confidence
+    // 5. Sort by source priority + confidence
     sort_results(&mut results, prefs);
 
-    // 7. Deduplicate by (source, attr)
+    // 6. Deduplicate by (source, attr)
     deduplicate_results(results)
 }
 
@@ -755,6 +883,52 @@ mod tests {
         assert!(!command_available("__nx_definitely_not_a_command__"));
     }
 
+    // --- SearchPool ---
+
+    fn wait_for_idle(pool: &SearchPool, idle: usize) {
+        let deadline = Instant::now() + Duration::from_secs(5);
+        while pool.idle.load(Ordering::Acquire) != idle {
+            assert!(Instant::now() < deadline, "pool should reach {idle} idle");
+            sleep(Duration::from_millis(1));
+        }
+    }
+
+    #[test]
+    fn search_pool_reuses_idle_worker() {
+        let pool: &'static SearchPool = Box::leak(Box::new(SearchPool::new()));
+        let (tx, rx) = mpsc::channel();
+
+        for _ in 0..2 {
+            let tx = tx.clone();
+            pool.run(Box::new(move || {
+                tx.send(thread::current().id()).unwrap();
+            }));
+            wait_for_idle(pool, 1);
+        }
+
+        let first = rx.recv().expect("first job should run");
+        let second = rx.recv().expect("second job should run");
+        assert_eq!(first, second);
+    }
+
+    #[test]
+    fn search_pool_runs_job_beside_a_busy_worker() {
+        let pool: &'static SearchPool = Box::leak(Box::new(SearchPool::new()));
+        let (release_tx, release_rx) = mpsc::channel::<()>();
+        let (done_tx, done_rx) = mpsc::channel();
+
+        pool.run(Box::new(move || {
+            let _ = release_rx.recv();
+        }));
+        pool.run(Box::new(move || done_tx.send(()).unwrap()));
+
+        done_rx
+            .recv_timeout(Duration::from_secs(5))
+            .expect("job should not wait for the busy worker");
+        release_tx.send(()).unwrap();
+        wait_for_idle(pool, 2);
+    }
+
     // --- parallel_search_with ---
 
     fn stub_result(source: PackageSource, attr: &str) -> SourceResult {
@@ -787,6 +961,57 @@ mod tests {
         Vec::new()
     }
 
+    fn stub_brew_empty(_name: &str) -> SearchCallResult {
+        Vec::new()
+    }
+
+    fn stub_homebrew_found(_name: &str) -> SearchCallResult {
+        vec![stub_result(PackageSource::Homebrew, "ripgrep")]
+    }
+
+    fn stub_cask_slow(_name: &str) -> SearchCallResult {
+        sleep(Duration::from_millis(200));
+        vec![stub_result(PackageSource::Cask, "ripgrep")]
+    }
+
+    #[test]
+    fn parallel_search_collects_homebrew_and_cask_with_nix_sources() {
+        let mut warnings = Vec::new();
+        let started = Instant::now();
+
+        let mut results = parallel_search_with(
+            "ripgrep",
+            &SourcePreferences::default(),
+            None,
+            ParallelSearchOptions {
+                warn_on_timeout: true,
+                timeout: Duration::from_secs(2),
+            },
+            |message| warnings.push(message.to_string()),
+            SearchFns {
+                nxs: stub_nxs_slow,
+                flake_inputs: stub_flake_empty,
+                nur: stub_nur_fast,
+                homebrew: stub_homebrew_found,
+                cask: stub_cask_slow,
+            },
+        );
+
+        // The slow cask lookup overlaps the slow nxs search.
+        assert!(started.elapsed() < Duration::from_millis(400));
+        results.sort_by_key(|result| result.source.as_str());
+        let sources: Vec<_> = results.iter().map(|result| result.source).collect();
+        assert_eq!(
+            sources,
+            [
+                PackageSource::Cask,
+                PackageSource::Homebrew,
+                PackageSource::Nxs
+            ]
+        );
+        assert!(warnings.is_empty(), "unexpected warnings: {warnings:?}");
+    }
+
     #[test]
     fn parallel_search_timeout_returns_partial_results_and_warns() {
         let prefs = SourcePreferences {
@@ -809,6 +1034,8 @@ mod tests {
                 nxs: stub_nxs_slow,
                 flake_inputs: stub_flake_empty,
                 nur: stub_nur_fast,
+                homebrew: stub_brew_empty,
+                cask: stub_brew_empty,
             },
         );
 
@@ -844,6 +1071,8 @@ mod tests {
                 nxs: stub_nxs_slow,
                 flake_inputs: stub_flake_empty,
                 nur: stub_nur_fast,
+                homebrew: stub_brew_empty,
+                cask: stub_brew_empty,
             },
         );
 
@@ -872,6 +1101,8 @@ mod tests {
                 nxs: stub_nxs_failed,
                 flake_inputs: stub_flake_empty,
                 nur: stub_nur_fast,
+                homebrew: stub_brew_empty,
+                cask: stub_brew_empty,
             },
         );
 
@@ -906,6 +1137,8 @@ mod tests {
                 nxs: stub_nxs_failed,
                 flake_inputs: stub_flake_empty,
                 nur: stub_nur_fast,
+                homebrew: stub_brew_empty,
+                cask: stub_brew_empty,
             },
         );
 
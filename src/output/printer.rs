@@ -1,41 +1,103 @@
+use std::fmt;
 use std::io::{self, BufRead, Write};
 
-use crate::output::style::{IconSet, OutputStyle};
+use crate::output::style::{OutputStyle, stdout_is_capable_terminal};
 
-struct GlyphSet {
+/// Everything a status line carries before its message text (color code,
+/// leading newline, glyph, separator) plus the matching reset, spelled out
+/// per style so no prefix is formatted at print time.
+#[derive(Debug)]
+struct LinePrefixes {
     action: &'static str,
     success: &'static str,
     warning: &'static str,
     error: &'static str,
     dry_run: &'static str,
+    reset: &'static str,
 }
 
+/// Indexed by `IconSet` discriminant, then by `OutputStyle::color`.
+static LINE_PREFIXES: [[LinePrefixes; 2]; 2] = [
+    // IconSet::Unicode
+    [
+        LinePrefixes {
+            action: "\n➜ ",
+            success: "✔ ",
+            warning: "! ",
+            error: "✘ ",
+            dry_run: "\n~ ",
+            reset: "",
+        },
+        LinePrefixes {
+            action: "\x1b[36m\n➜ ",
+            success: "\x1b[32m✔ ",
+            warning: "\x1b[33m! ",
+            error: "\x1b[1;31m✘ ",
+            dry_run: "\x1b[33m\n~ ",
+            reset: "\x1b[0m",
+        },
+    ],
+    // IconSet::Minimal
+    [
+        LinePrefixes {
+            action: "\n> ",
+            success: "+ ",
+            warning: "! ",
+            error: "x ",
+            dry_run: "\n~ ",
+            reset: "",
+        },
+        LinePrefixes {
+            action: "\x1b[36m\n> ",
+            success: "\x1b[32m+ ",
+            warning: "\x1b[33m! ",
+            error: "\x1b[1;31mx ",
+            dry_run: "\x1b[33m\n~ ",
+            reset: "\x1b[0m",
+        },
+    ],
+];
+
+/// DEC private mode 2026: begin/end a synchronized terminal update.
+const SYNC_BEGIN: &str = "\x1b[?2026h";
+const SYNC_END: &str = "\x1b[?2026l";
+
+/// Holds only a static prefix table resolved from its style, so it is `Copy`
+/// and can be shared freely.
+#[derive(Debug, Clone, Copy)]
 pub struct Printer {
-    style: OutputStyle,
+    prefixes: &'static LinePrefixes,
 }
 
 impl Printer {
     pub const fn new(style: OutputStyle) -> Self {
-        Self { style }
+        Self {
+            prefixes: &LINE_PREFIXES[style.icon_set as usize][style.color as usize],
+        }
+    }
+
+    /// Printer for plain output, built without any flag or terminal checks.
+    pub const fn plain() -> Self {
+        Self::new(OutputStyle::PLAIN)
     }
 
-    pub fn action(&self, text: &str) {
+    pub fn action(self, text: &str) {
         println!("{}", self.action_line(text));
     }
 
-    pub fn success(&self, text: &str) {
+    pub fn success(self, text: &str) {
         println!("{}", self.success_line(text));
     }
 
-    pub fn warn(&self, text: &str) {
+    pub fn warn(self, text: &str) {
         println!("{}", self.warn_line(text));
     }
 
-    pub fn error(&self, text: &str) {
+    pub fn error(self, text: &str) {
         eprintln!("{}", self.error_line(text));
     }
 
-    pub fn dry_run_banner(&self) {
+    pub fn dry_run_banner(self) {
         println!("{}", self.dry_run_line());
     }
 
@@ -47,17 +109,86 @@ impl Printer {
         eprintln!(" done");
     }
 
-    pub fn detail(text: &str) {
+    /// Indented detail line. Accepts `&format_args!(..)` so callers can skip
+    /// building an intermediate `String`.
+    pub fn detail<T: fmt::Display + ?Sized>(text: &T) {
         println!("  {text}");
     }
 
-    pub fn stream_line(text: &str, indent: &str, width: usize) {
-        for segment in wrapped_segments(text, width.saturating_sub(indent.len()).max(20)) {
-            println!("{indent}{segment}");
+    /// Detail line preceded by a blank separator, written in one call.
+    pub fn detail_spaced<T: fmt::Display + ?Sized>(text: &T) {
+        println!("\n  {text}");
+    }
+
+    /// Write pre-rendered lines with one locked write instead of one per line.
+    pub fn lines<S: AsRef<str>>(lines: impl IntoIterator<Item = S>) {
+        Self::indented_lines("", lines);
+    }
+
+    /// Like [`Printer::lines`] with a shared prefix, appended in place so long
+    /// listings never format a `String` per entry.
+    pub fn indented_lines<S: AsRef<str>>(indent: &str, lines: impl IntoIterator<Item = S>) {
+        let mut out = String::new();
+        for line in lines {
+            out.push_str(indent);
+            out.push_str(line.as_ref());
+            out.push('\n');
+        }
+        let _ = io::stdout().lock().write_all(out.as_bytes());
+    }
+
+    /// Content width left for streamed lines under `indent`. Callers resolve it
+    /// once per stream rather than once per line.
+    ///
+    /// Redirected output is left unwrapped, so every line takes the direct
+    /// append path in [`Printer::push_stream_line`].
+    pub fn stream_content_width(indent: &str, width: usize) -> usize {
+        if !stdout_is_capable_terminal() {
+            return usize::MAX;
         }
+        width.saturating_sub(indent.len()).max(20)
     }
 
-    pub fn confirm(prompt: &str, default_yes: bool) -> bool {
+    /// Write a block of rendered lines under one stdout lock. On an
+    /// interactive terminal the block is bracketed as a synchronized update so
+    /// a burst of lines is drawn as one frame; terminals without mode 2026
+    /// ignore it. The markers are written around the block rather than
+    /// formatted into a copy of it, and the flush keeps the closing marker
+    /// from waiting in the line buffer.
+    pub fn write_block(block: &str) {
+        let mut stdout = io::stdout().lock();
+        if stdout_is_capable_terminal() {
+            let _ = stdout
+                .write_all(SYNC_BEGIN.as_bytes())
+                .and_then(|()| stdout.write_all(block.as_bytes()))
+                .and_then(|()| stdout.write_all(SYNC_END.as_bytes()))
+                .and_then(|()| stdout.flush());
+        } else {
+            let _ = stdout.write_all(block.as_bytes());
+        }
+    }
+
+    /// Append one streamed line, wrapped to `max_content`, to `out`; callers
+    /// decide when the buffered lines are written.
+    pub fn push_stream_line(out: &mut String, text: &str, indent: &str, max_content: usize) {
+        // Most streamed lines are short: a byte length within the budget
+        // bounds the char count too, so skip counting and wrapping entirely.
+        // Lines carrying ANSI escapes are also kept whole; splitting them could
+        // cut a sequence in half, and only those lines pay for the byte scan.
+        if text.len() <= max_content || text.as_bytes().contains(&0x1b) {
+            out.push_str(indent);
+            out.push_str(text);
+            out.push('\n');
+            return;
+        }
+        for segment in wrapped_segments(text, max_content) {
+            out.push_str(indent);
+            out.push_str(segment);
+            out.push('\n');
+        }
+    }
+
+    pub fn confirm<T: fmt::Display + ?Sized>(prompt: &T, default_yes: bool) -> bool {
         let suffix = if default_yes { " [Y/n]: " } else { " [y/N]: " };
         print!("  {prompt}{suffix}");
         let _ = io::stdout().flush();
@@ -69,77 +200,72 @@ impl Printer {
         }
     }
 
-    const fn glyphs(&self) -> GlyphSet {
-        match self.style.icon_set {
-            IconSet::Unicode => GlyphSet {
-                action: "➜",
-                success: "✔",
-                warning: "!",
-                error: "✘",
-                dry_run: "~",
-            },
-            IconSet::Minimal => GlyphSet {
-                action: ">",
-                success: "+",
-                warning: "!",
-                error: "x",
-                dry_run: "~",
-            },
-        }
-    }
-
-    fn action_line(&self, text: &str) -> String {
-        self.paint(format!("\n{} {text}", self.glyphs().action), "36")
+    fn action_line(self, text: &str) -> String {
+        self.paint_line(self.prefixes.action, text)
     }
 
-    fn success_line(&self, text: &str) -> String {
-        self.paint(format!("{} {text}", self.glyphs().success), "32")
+    fn success_line(self, text: &str) -> String {
+        self.paint_line(self.prefixes.success, text)
     }
 
-    fn warn_line(&self, text: &str) -> String {
-        self.paint(format!("{} {text}", self.glyphs().warning), "33")
+    fn warn_line(self, text: &str) -> String {
+        self.paint_line(self.prefixes.warning, text)
     }
 
-    fn error_line(&self, text: &str) -> String {
-        self.paint(format!("{} {text}", self.glyphs().error), "1;31")
+    fn error_line(self, text: &str) -> String {
+        self.paint_line(self.prefixes.error, text)
     }
 
-    fn dry_run_line(&self) -> String {
-        self.paint(
-            format!(
-                "\n{} Dry Run (no changes will be made)",
-                self.glyphs().dry_run
-            ),
-            "33",
-        )
+    fn dry_run_line(self) -> String {
+        self.paint_line(self.prefixes.dry_run, "Dry Run (no changes will be made)")
     }
 
-    fn paint(&self, text: String, code: &str) -> String {
-        if self.style.color {
-            format!("\x1b[{code}m{text}\x1b[0m")
-        } else {
-            text
-        }
+    fn paint_line(self, prefix: &str, text: &str) -> String {
+        format!("{prefix}{text}{}", self.prefixes.reset)
     }
 }
 
 fn parse_confirm_response(response: &str, default_yes: bool) -> bool {
-    let trimmed = response.trim().to_ascii_lowercase();
+    // Compared in place; answers are read once per prompt, whether typed or
+    // piped, so there is no reason to allocate a lowercased copy.
+    let trimmed = response.trim();
     if trimmed.is_empty() {
         return default_yes;
     }
-    trimmed == "y" || trimmed == "yes"
+    trimmed.eq_ignore_ascii_case("y") || trimmed.eq_ignore_ascii_case("yes")
 }
 
-fn wrapped_segments(line: &str, max_content: usize) -> Vec<&str> {
-    if line.chars().count() <= max_content {
-        return vec![line];
+/// Segments of `line` no wider than `max_content` chars, produced on demand
+/// so wrapping appends straight into the output without a segment `Vec`.
+fn wrapped_segments(line: &str, max_content: usize) -> WrappedSegments<'_> {
+    WrappedSegments {
+        remaining: line,
+        remaining_chars: line.chars().count(),
+        max_content,
     }
+}
+
+struct WrappedSegments<'a> {
+    remaining: &'a str,
+    // Counted once up front; each segment subtracts only what it consumed
+    // instead of recounting the whole remainder.
+    remaining_chars: usize,
+    max_content: usize,
+}
 
-    let mut out = Vec::new();
-    let mut remaining = line;
-    while remaining.chars().count() > max_content {
-        let candidate = nth_char_boundary(remaining, max_content);
+impl<'a> Iterator for WrappedSegments<'a> {
+    type Item = &'a str;
+
+    fn next(&mut self) -> Option<&'a str> {
+        if self.remaining.is_empty() {
+            return None;
+        }
+        if self.remaining_chars <= self.max_content {
+            return Some(std::mem::take(&mut self.remaining));
+        }
+
+        let remaining = self.remaining;
+        let candidate = nth_char_boundary(remaining, self.max_content);
         let split = match remaining[..candidate].rfind(' ') {
             // Avoid producing tiny leading fragments like "File" when the first
             // meaningful split point is near the hard width boundary.
@@ -147,21 +273,14 @@ fn wrapped_segments(line: &str, max_content: usize) -> Vec<&str> {
             _ => candidate,
         }
         .max(1);
-        out.push(&remaining[..split]);
-        remaining = remaining[split..].trim_start();
-        if remaining.is_empty() {
-            return out;
-        }
+        let rest = remaining[split..].trim_start();
+        self.remaining_chars -= remaining[..remaining.len() - rest.len()].chars().count();
+        self.remaining = rest;
+        Some(&remaining[..split])
     }
-
-    out.push(remaining);
-    out
 }
 
 fn nth_char_boundary(input: &str, n: usize) -> usize {
-    if input.chars().count() <= n {
-        return input.len();
-    }
     input
         .char_indices()
         .nth(n)
@@ -175,10 +294,40 @@ mod tests {
 
     #[test]
     fn wrapped_segments_preserves_long_word_chunks() {
-        let segments = wrapped_segments("alpha beta gamma delta", 8);
+        let segments = wrapped_segments("alpha beta gamma delta", 8).collect::<Vec<_>>();
         assert_eq!(segments, vec!["alpha", "beta", "gamma", "delta"]);
     }
 
+    #[test]
+    fn push_stream_line_keeps_short_lines_whole() {
+        let mut out = String::new();
+        Printer::push_stream_line(&mut out, "building foo", "    ", 20);
+        Printer::push_stream_line(&mut out, "alpha beta gamma delta", "  ", 8);
+        assert_eq!(out, "    building foo\n  alpha\n  beta\n  gamma\n  delta\n");
+    }
+
+    #[test]
+    fn push_stream_line_keeps_lines_within_budget_whole() {
+        let mut out = String::new();
+        Printer::push_stream_line(&mut out, "copying path 'é' → store", "  ", 24);
+        Printer::push_stream_line(&mut out, "alpha beta", "  ", usize::MAX);
+        assert_eq!(out, "  copying path 'é' → store\n  alpha beta\n");
+    }
+
+    #[test]
+    fn push_stream_line_never_splits_ansi_styled_lines() {
+        let styled = "\x1b[1mwarning:\x1b[0m alpha beta gamma delta";
+        let mut out = String::new();
+        Printer::push_stream_line(&mut out, styled, "  ", 8);
+        assert_eq!(out, format!("  {styled}\n"));
+    }
+
+    #[test]
+    fn wrapped_segments_counts_multibyte_chars_not_bytes() {
+        let segments = wrapped_segments("ééééé ééééé ééé", 12).collect::<Vec<_>>();
+        assert_eq!(segments, vec!["ééééé ééééé", "ééé"]);
+    }
+
     #[test]
     fn printer_uses_unicode_glyphs_when_requested() {
         let printer = Printer::new(OutputStyle {
@@ -187,10 +336,10 @@ mod tests {
             color: false,
         });
 
-        let glyphs = printer.glyphs();
-        assert_eq!(glyphs.action, "➜");
-        assert_eq!(glyphs.success, "✔");
-        assert_eq!(glyphs.error, "✘");
+        let prefixes = printer.prefixes;
+        assert_eq!(prefixes.action, "\n➜ ");
+        assert_eq!(prefixes.success, "✔ ");
+        assert_eq!(prefixes.error, "✘ ");
     }
 
     #[test]
@@ -201,10 +350,10 @@ mod tests {
             color: false,
         });
 
-        let glyphs = printer.glyphs();
-        assert_eq!(glyphs.action, ">");
-        assert_eq!(glyphs.success, "+");
-        assert_eq!(glyphs.error, "x");
+        let prefixes = printer.prefixes;
+        assert_eq!(prefixes.action, "\n> ");
+        assert_eq!(prefixes.success, "+ ");
+        assert_eq!(prefixes.error, "x ");
     }
 
     #[test]
@@ -215,7 +364,7 @@ mod tests {
                 icon_set,
                 color: false,
             });
-            assert_eq!(printer.glyphs().warning, "!");
+            assert_eq!(printer.prefixes.warning, "! ");
         }
     }
 
@@ -1,6 +1,8 @@
 use std::env;
 use std::io::IsTerminal;
+use std::sync::OnceLock;
 
+/// Variant order indexes the printer's line prefix table.
 #[derive(Debug, Clone, Copy, Eq, PartialEq)]
 pub enum IconSet {
     Unicode,
@@ -15,32 +17,51 @@ pub struct OutputStyle {
 }
 
 impl OutputStyle {
+    /// Plain output: minimal glyphs and no color, without probing the terminal.
+    pub const PLAIN: Self = Self {
+        plain: true,
+        icon_set: IconSet::Minimal,
+        color: false,
+    };
+
     pub fn from_flags(plain: bool, unicode: bool, minimal: bool) -> Self {
-        let icon_set = if minimal || plain {
-            IconSet::Minimal
-        } else if unicode {
+        if plain {
+            return Self::PLAIN;
+        }
+        let icon_set = if unicode && !minimal {
             IconSet::Unicode
         } else {
             IconSet::Minimal
         };
 
         Self {
-            plain,
+            plain: false,
             icon_set,
-            color: use_color(plain),
+            color: terminal_supports_color(),
         }
     }
 }
 
-fn use_color(plain: bool) -> bool {
-    color_enabled(
-        plain,
-        ColorPolicyInput {
-            no_color_set: env::var_os("NO_COLOR").is_some(),
-            term_is_dumb: matches!(env::var("TERM").as_deref(), Ok("dumb")),
-            stdout_is_terminal: std::io::stdout().is_terminal(),
-        },
-    )
+fn terminal_supports_color() -> bool {
+    color_enabled(false, terminal_probe())
+}
+
+/// Whether stdout is an interactive terminal that can honor escape-based
+/// control sequences.
+pub fn stdout_is_capable_terminal() -> bool {
+    let probe = terminal_probe();
+    probe.stdout_is_terminal && !probe.term_is_dumb
+}
+
+/// Probe the environment and stdout on first use and share the result with
+/// every output decision; none of the inputs change during a CLI run.
+fn terminal_probe() -> ColorPolicyInput {
+    static PROBE: OnceLock<ColorPolicyInput> = OnceLock::new();
+    *PROBE.get_or_init(|| ColorPolicyInput {
+        no_color_set: env::var_os("NO_COLOR").is_some(),
+        term_is_dumb: matches!(env::var("TERM").as_deref(), Ok("dumb")),
+        stdout_is_terminal: std::io::stdout().is_terminal(),
+    })
 }
 
 #[derive(Debug, Clone, Copy)]
@@ -69,6 +90,7 @@ mod tests {
         let style = OutputStyle::from_flags(true, true, false);
         assert_eq!(style.icon_set, IconSet::Minimal);
         assert!(!style.color);
+        assert_eq!(style, OutputStyle::PLAIN);
     }
 
     #[test]